@@ -1,5 +1,5 @@
 from loguru import logger
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -32,10 +32,43 @@ class Postgres(BaseModel):
     charset: str = Field(..., alias='postgres_charset')
 
 
+def split_list(value):
+    """Listas no .env: valores separados por vírgula"""
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(',') if item.strip()]
+    return value
+
+
 class JWT(BaseModel):
     secret: str = Field(..., alias='jwt_secret')
     algorithm: str = Field(..., alias='jwt_algorithm')
     expiration_time: int = Field(..., alias='jwt_expiration_time')
+    cache_max_size: int = Field(10000, alias='jwt_cache_max_size')
+    cache_ttl: int = Field(300, alias='jwt_cache_ttl')
+    # EdDSA/ES256: PEMs privados (o primeiro assina) e públicos aposentados
+    private_keys: list[str] = Field([], alias='jwt_private_keys')
+    public_keys: list[str] = Field([], alias='jwt_public_keys')
+    jwks_max_age: int = Field(3600, alias='jwt_jwks_max_age')
+    # access token curto (só assinatura) + refresh token rotativo no Redis
+    refresh_tokens: bool = Field(False, alias='jwt_refresh_tokens')
+    access_expiration_time: int = Field(
+        300, alias='jwt_access_expiration_time'
+    )
+    refresh_expiration_time: int = Field(
+        604800, alias='jwt_refresh_expiration_time'
+    )
+    # jtis revogados: Bloom filter por worker sincronizado por pub/sub
+    revocation_capacity: int = Field(100000, alias='jwt_revocation_capacity')
+    revocation_error_rate: float = Field(
+        0.001, alias='jwt_revocation_error_rate'
+    )
+    revocation_rebuild_interval: int = Field(
+        3600, alias='jwt_revocation_rebuild_interval'
+    )
+
+    _split = field_validator('private_keys', 'public_keys', mode='before')(
+        split_list
+    )
 
     def model_post_init(self, __contex):
         self.secret = self.secret.replace('\n', '')
@@ -48,6 +81,35 @@ class Redis(BaseModel):
     port: str = Field(..., alias='redis_port')
     db: int = Field(..., alias='redis_db')
     ttl: int = Field(..., alias='redis_ttl')
+    max_connections: int = Field(50, alias='redis_max_connections')
+    pool_timeout: float = Field(5, alias='redis_pool_timeout')
+    socket_timeout: float = Field(5, alias='redis_socket_timeout')
+    socket_connect_timeout: float = Field(
+        2, alias='redis_socket_connect_timeout'
+    )
+    health_check_interval: int = Field(30, alias='redis_health_check_interval')
+    retries: int = Field(3, alias='redis_retries')
+    retry_backoff_base: float = Field(0.05, alias='redis_retry_backoff_base')
+    retry_backoff_cap: float = Field(1, alias='redis_retry_backoff_cap')
+    session_codec: str = Field('json', alias='redis_session_codec')
+    session_layout: str = Field('string', alias='redis_session_layout')
+    sliding_sessions: bool = Field(False, alias='redis_sliding_sessions')
+    sliding_threshold: int = Field(900, alias='redis_sliding_threshold')
+    sliding_flush_ms: int = Field(500, alias='redis_sliding_flush_ms')
+    near_cache: bool = Field(False, alias='redis_near_cache')
+    near_cache_max_entries: int = Field(
+        10000, alias='redis_near_cache_max_entries'
+    )
+    near_cache_ttl: int = Field(300, alias='redis_near_cache_ttl')
+    near_cache_prefixes: list[str] = Field(
+        ['session:'], alias='redis_near_cache_prefixes'
+    )
+    # nós das sessões 'host:port/db' separados por vírgula (vazio: só host)
+    shards: list[str] = Field([], alias='redis_shards')
+
+    _split = field_validator('near_cache_prefixes', 'shards', mode='before')(
+        split_list
+    )
 
 
 class AppConfig(BaseModel):
@@ -57,6 +119,8 @@ class AppConfig(BaseModel):
     summary: str = Field(..., alias='app_summary')
     auth_method: str = Field(..., alias='app_auth_method')
     login_mode: str = Field(..., alias='app_login_mode')
+    session_store: str = Field('redis', alias='app_session_store')
+    session_max_entries: int = Field(100000, alias='app_session_max_entries')
     env: str = Field(..., alias='app_env')
 
 
@@ -66,6 +130,54 @@ class TOTP(BaseModel):
     window: int = Field(..., alias='totp_window')
 
 
+class HashPass(BaseModel):
+    executor: str = Field('thread', alias='hashpass_executor')
+    workers: int = Field(0, alias='hashpass_workers')
+    max_queue: int = Field(64, alias='hashpass_max_queue')
+    retry_after: int = Field(1, alias='hashpass_retry_after')
+    algorithm: str = Field('bcrypt', alias='hashpass_algorithm')
+    bcrypt_rounds: int = Field(12, alias='hashpass_bcrypt_rounds')
+    argon2_time_cost: int = Field(3, alias='hashpass_argon2_time_cost')
+    argon2_memory_cost: int = Field(65536, alias='hashpass_argon2_memory_cost')
+    argon2_parallelism: int = Field(4, alias='hashpass_argon2_parallelism')
+
+
+class Cache(BaseModel):
+    user_cache_ttl: int = Field(30, alias='cache_user_ttl')
+    user_cache_max_size: int = Field(10000, alias='cache_user_max_size')
+    signup_filter_capacity: int = Field(
+        1000000, alias='cache_signup_filter_capacity'
+    )
+    signup_filter_error_rate: float = Field(
+        0.01, alias='cache_signup_filter_error_rate'
+    )
+
+
+class Email(BaseModel):
+    # consulta MX assíncrona no cadastro (UserController.create)
+    check_deliverability: bool = Field(
+        True, alias='email_check_deliverability'
+    )
+    dns_timeout: float = Field(3, alias='email_dns_timeout')
+    cache_ttl: int = Field(3600, alias='email_cache_ttl')
+    cache_negative_ttl: int = Field(300, alias='email_cache_negative_ttl')
+    cache_max_size: int = Field(10000, alias='email_cache_max_size')
+
+
+class RateLimit(BaseModel):
+    enabled: bool = Field(True, alias='ratelimit_enabled')
+    window: int = Field(60, alias='ratelimit_window')
+    # requisições por janela; 0 desliga o limite
+    ip: int = Field(20, alias='ratelimit_ip')
+    username: int = Field(10, alias='ratelimit_username')
+    total: int = Field(1000, alias='ratelimit_global')
+    local_max_entries: int = Field(10000, alias='ratelimit_local_max_entries')
+    # proxies cujo X-Forwarded-For é aceito (IPs ou redes, ex.: 10.0.0.0/8)
+    trusted_proxies: list[str] = Field([], alias='ratelimit_trusted_proxies')
+
+    _split = field_validator('trusted_proxies', mode='before')(split_list)
+
+
 class Config(BaseModel):
     # mysql: Mysql = None  # Comentado - usar postgres
     postgres: Postgres = None
@@ -73,6 +185,10 @@ class Config(BaseModel):
     redis: Redis = None
     app: AppConfig = None
     totp: TOTP = None
+    hashpass: HashPass = None
+    cache: Cache = None
+    ratelimit: RateLimit = None
+    email: Email = None
 
     def model_post_init(self, __context):
         import os
@@ -94,6 +210,10 @@ class Config(BaseModel):
         self.redis = Redis(**env_dict)
         self.app = AppConfig(**env_dict)
         self.totp = TOTP(**env_dict)
+        self.hashpass = HashPass(**env_dict)
+        self.cache = Cache(**env_dict)
+        self.ratelimit = RateLimit(**env_dict)
+        self.email = Email(**env_dict)
 
 
 # singleton leitura unica do .env
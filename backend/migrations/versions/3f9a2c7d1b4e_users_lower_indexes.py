@@ -0,0 +1,55 @@
+"""users lower(email) / lower(username) indexes
+
+Revision ID: 3f9a2c7d1b4e
+Revises: 66e8e610e641
+Create Date: 2026-10-17 19:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a2c7d1b4e'
+down_revision: Union[str, Sequence[str], None] = '66e8e610e641'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY não bloqueia escritas na tabela (não roda em transação)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_lower',
+            'users',
+            [sa.text('lower(email)')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_users_username_lower',
+            'users',
+            [sa.text('lower(username)')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_username_lower',
+            table_name='users',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_users_email_lower',
+            table_name='users',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
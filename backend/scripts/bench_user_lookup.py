@@ -0,0 +1,141 @@
+"""
+Benchmark da busca do login: OR em email/username x índice lower() único
+
+Cria (uma vez) a tabela bench_users com a mesma estrutura de índices de
+users, popula com generate_series, imprime o EXPLAIN ANALYZE de cada
+consulta e a latência de N execuções com identificadores aleatórios
+
+uso (em backend/):
+    python -m scripts.bench_user_lookup --rows 10000000 --queries 2000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from src.infra.database.connect.sql import URI
+
+TABLE = 'bench_users'
+
+SETUP = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {TABLE} (
+        id serial PRIMARY KEY,
+        name varchar(255) NOT NULL,
+        email varchar(255),
+        phone varchar(21),
+        document varchar(20),
+        username varchar(64),
+        password varchar(128),
+        logged_in boolean DEFAULT false,
+        secret_otp varchar(128),
+        otp boolean DEFAULT false,
+        allowed boolean DEFAULT true,
+        attempts integer DEFAULT 0,
+        blocked boolean DEFAULT false,
+        last_login timestamp,
+        created_at timestamp DEFAULT now(),
+        updated_at timestamp DEFAULT now()
+    )
+    """,
+    f'CREATE UNIQUE INDEX IF NOT EXISTS ix_{TABLE}_email ON {TABLE} (email)',
+    f'CREATE UNIQUE INDEX IF NOT EXISTS ix_{TABLE}_username '
+    f'ON {TABLE} (username)',
+    f'CREATE INDEX IF NOT EXISTS ix_{TABLE}_email_lower '
+    f'ON {TABLE} (lower(email))',
+    f'CREATE INDEX IF NOT EXISTS ix_{TABLE}_username_lower '
+    f'ON {TABLE} (lower(username))',
+]
+
+SEED = f"""
+INSERT INTO {TABLE} (name, email, username, password, secret_otp)
+SELECT 'user ' || i, 'user' || i || '@example.com', 'user' || i,
+       repeat('x', 60), repeat('s', 32)
+FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) AS i
+"""
+
+# consulta atual de UserRepository.find (linha inteira, todas as linhas)
+OR_QUERY = f'SELECT * FROM {TABLE} WHERE email = :u OR username = :u'
+
+# UserRepository.find_for_signin (colunas do login, um índice, LIMIT 1)
+COLUMNS = 'id, username, email, password, secret_otp, otp, blocked, attempts'
+EMAIL_QUERY = f'SELECT {COLUMNS} FROM {TABLE} WHERE lower(email) = :u LIMIT 1'
+USERNAME_QUERY = (
+    f'SELECT {COLUMNS} FROM {TABLE} WHERE lower(username) = :u LIMIT 1'
+)
+
+
+async def seed(conn: AsyncConnection, rows: int):
+    for statement in SETUP:
+        await conn.execute(text(statement))
+    count = await conn.scalar(text(f'SELECT count(*) FROM {TABLE}'))
+    batch = 1000000
+    for start in range(count + 1, rows + 1, batch):
+        stop = min(start + batch - 1, rows)
+        await conn.execute(text(SEED), {'start': start, 'stop': stop})
+        await conn.commit()
+        print(f'seeded {stop}/{rows}')
+    await conn.execute(text(f'ANALYZE {TABLE}'))
+    await conn.commit()
+
+
+async def explain(conn: AsyncConnection, query: str, value: str):
+    result = await conn.execute(
+        text(f'EXPLAIN (ANALYZE, BUFFERS) {query}'), {'u': value}
+    )
+    print(f'\n{query}')
+    for (line,) in result:
+        print(f'  {line}')
+
+
+async def measure(
+    conn: AsyncConnection, name: str, query: str, values: list[str]
+):
+    timings = []
+    statement = text(query)
+    for value in values:
+        started = time.perf_counter()
+        (await conn.execute(statement, {'u': value})).all()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(
+        f'{name:<14} mean {statistics.mean(timings):.3f}ms '
+        f'p50 {statistics.median(timings):.3f}ms p99 {p99:.3f}ms'
+    )
+
+
+async def main(rows: int, queries: int):
+    engine = create_async_engine(URI)
+    try:
+        async with engine.connect() as conn:
+            await seed(conn, rows)
+
+            ids = [random.randint(1, rows) for _ in range(queries)]
+            emails = [f'user{i}@example.com' for i in ids]
+            usernames = [f'user{i}' for i in ids]
+
+            await explain(conn, OR_QUERY, emails[0])
+            await explain(conn, EMAIL_QUERY, emails[0])
+            await explain(conn, USERNAME_QUERY, usernames[0])
+
+            print()
+            await measure(conn, 'or (email)', OR_QUERY, emails)
+            await measure(conn, 'or (username)', OR_QUERY, usernames)
+            await measure(conn, 'lower(email)', EMAIL_QUERY, emails)
+            await measure(conn, 'lower(user)', USERNAME_QUERY, usernames)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.queries))
@@ -3,7 +3,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 
+from src.infra.cache.signup import signup_filter
+from src.infra.cache.user import user_cache
+from src.infra.database.connect.redis import close_pools, redis_manager
+from src.infra.database.connect.session import session_manager
 from src.infra.database.model import init_db
+from src.infra.security.auth.revocation import token_revocation
+from src.infra.security.hashpass import hash_pass_manager
 from src.interfaces.routers import configure_routers
 
 app = FastAPI(
@@ -40,5 +46,21 @@ async def startup_event():
             else:
                 raise
 
+    await session_manager.start()
+    user_cache.start()
+    signup_filter.start()
+    token_revocation.start()
+
+
+@app.on_event('shutdown')
+async def shutdown_event():
+    await user_cache.stop()
+    await signup_filter.stop()
+    await token_revocation.stop()
+    await session_manager.stop()
+    hash_pass_manager.pool.shutdown()
+    await redis_manager.close()
+    await close_pools()
+
 
 configure_routers(app)
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import io
 import json
@@ -12,13 +13,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.adapter.repository.user import UserRepository
 from src.core.domain.user import UserBusinessRules
 from src.core.ports.controllers import ControllerPort
-from src.infra.database.connect.redis import redis_manager, session_manager
-from src.infra.security.auth.jwt import jwt_manager
+from src.infra.cache.signup import signup_filter
+from src.infra.cache.user import user_cache
+from src.infra.database.connect.redis import redis_manager
+from src.infra.database.connect.session import session_manager
+from src.infra.database.connect.sql import Session
+from src.infra.email import email_deliverability
+from src.infra.security.auth.jwt import Authorization, jwt_manager
+from src.infra.security.auth.refresh import refresh_manager
 from src.infra.security.hashpass import hash_pass_manager
 from src.infra.security.otp import otp_manager
 from src.interfaces.schema.auth import SignIn, SignUp
 from src.utils import get_uuid
-from src.utils.helpers.sql import save_and_refresh
+from src.utils.helpers.sql import UnitOfWork, release
 
 
 def _ensure_png_bytes(image_any) -> bytes:
@@ -39,28 +46,66 @@ def _ensure_png_bytes(image_any) -> bytes:
     raise TypeError('Formato de imagem não suportado')
 
 
+# referências fortes para tarefas em segundo plano não serem coletadas
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def _rehash_password(user_id: int, password: str, old_hash: str):
+    """Atualiza o hash da senha com os parâmetros atuais (fora da requisição)"""
+    try:
+        new_hash = await hash_pass_manager.hash_async(password)
+        async with Session() as session:
+            updated = await UserRepository(session).update_password_hash(
+                user_id, old_hash, new_hash
+            )
+        logger.info(f'Password rehashed for user {user_id}: {updated}')
+    except Exception as e:
+        # tenta novamente no próximo login
+        logger.warning(f'Password rehash failed for user {user_id}: {e}')
+
+
+def _access_payload(user, session_id: str = None) -> dict:
+    """Claims do access token (curto quando há refresh token)"""
+    expiration_time = (
+        config.jwt.access_expiration_time
+        if config.jwt.refresh_tokens
+        else config.jwt.expiration_time
+    )
+    exp = (
+        datetime.now(tz=ZoneInfo('UTC')) + timedelta(seconds=expiration_time)
+    ).timestamp()
+
+    payload = dict(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        exp=exp,
+        jti=get_uuid(),
+    )
+    if session_id:
+        payload['session_id'] = session_id
+    return payload
+
+
 async def create_auth(user, response: Response, sm: session_manager):
     """Função para criar uma autenticação"""
     if config.app.auth_method == 'JWT':
-        exp = (
-            datetime.now(tz=ZoneInfo('UTC'))
-            + timedelta(seconds=config.jwt.expiration_time)
-        ).timestamp()
-
-        payload = dict(
-            id=user.id,
-            username=user.username,
-            email=user.email,
-            exp=exp,
-        )
-
+        session_id = None
         if config.app.login_mode == 'UNIQUE':
-            session_id = get_uuid()
-            payload['session_id'] = session_id
+            session_id = sm.new_session_id(user.id)
+        payload = _access_payload(user, session_id)
+
+        if session_id:
             await sm.previous_session(session_id, payload, config.redis.ttl)
-        return jwt_manager.create(payload)
+
+        authorization = jwt_manager.create(payload)
+        if config.jwt.refresh_tokens:
+            authorization.refresh_token = await refresh_manager.issue(
+                user.id, session_id
+            )
+        return authorization
     else:
-        session_id = get_uuid()
+        session_id = sm.new_session_id(user.id)
 
         data = dict(
             id=user.id,
@@ -72,7 +117,7 @@ async def create_auth(user, response: Response, sm: session_manager):
             await sm.previous_session(session_id, data, config.redis.ttl)
 
         else:
-            await sm.create(session_id, user.id, config.redis.ttl)
+            await sm.create(session_id, data, config.redis.ttl)
 
         response.set_cookie(
             key='session',
@@ -96,13 +141,22 @@ class UserController(ControllerPort):
         self.redis_manager = redis_manager
         self.pass_manager = hash_pass_manager
         self.session_manager = session_manager
+        # alterações no UserModel são gravadas de uma vez no commit
+        self.uow = UnitOfWork(session)
+
+    async def _commit(self, user_model):
+        """Grava a unidade de trabalho e invalida o usuário nos caches"""
+        await self.uow.commit()
+        await user_cache.invalidate(user_model.id)
 
     async def _validate_user_exists(self, user: SignIn):
         """Valida se usuário existe no banco"""
-        already_exists = await self.repository.find(user)
-        if not already_exists:
+        user_model = await self.repository.find_for_signin(user.username)
+        # a conexão não fica presa durante o bcrypt
+        await release(self.session)
+        if user_model is None:
             raise HTTPException(status_code=404, detail='User not found')
-        return already_exists[0]
+        return user_model
 
     async def _check_user_blocked(self, user_model):
         """Verifica se usuário está bloqueado"""
@@ -112,39 +166,64 @@ class UserController(ControllerPort):
     async def _check_attempts_and_block(self, user_model):
         """Verifica tentativas e bloqueia se necessário (verificar melhor depois sobre)"""
         if UserBusinessRules.should_block_user(user_model.attempts):
-            user_model.blocked = True
-            await save_and_refresh(self.session, user_model)
+            self.uow.set(user_model, blocked=True)
+            await self._commit(user_model)
             raise HTTPException(status_code=401, detail='User blocked')
 
-    async def _validate_password(self, user: SignIn, user_model):
-        """Valida senha e incrementa tentativas se inválida"""
-        if not self.pass_manager.verify(user.password, user_model.password):
-            user_model.attempts += 1
-            await save_and_refresh(self.session, user_model)
-            rest_attemps = 3 - user_model.attempts
+    @staticmethod
+    def _attempts_key(user_id: int) -> str:
+        return f'login_attempts:{user_id}'
+
+    async def _register_failed_attempt(self, user_model, message: str):
+        """
+        Incrementa o contador de falhas no Redis (INCR atômico, sem
+        read-modify-write no UserModel) e só grava no Postgres ao bloquear
+        O contador não expira: as falhas somam até um login bem-sucedido
+        (_finalize_login) e a 3ª bloqueia, como quando ficava só no banco.
+        Se a chave se perder, recomeça da coluna attempts
+        """
+        attempts = await self.redis_manager.incr(
+            self._attempts_key(user_model.id), initial=user_model.attempts
+        )
+        rest_attemps = UserBusinessRules.remaining_attempts(attempts)
+
+        if UserBusinessRules.should_block_user(attempts):
+            self.uow.set(user_model, attempts=attempts, blocked=True)
+            await self._commit(user_model)
 
-            message = json.dumps(
+        raise HTTPException(
+            status_code=401,
+            detail=json.dumps(
                 {
-                    'message': 'invalid user or password',
+                    'message': message,
                     'rest_attemps': rest_attemps,
                 }
-            )
+            ),
+        )
 
-            if rest_attemps == 0:
-                user_model.blocked = True
-                await save_and_refresh(self.session, user_model)
+    async def _validate_password(self, user: SignIn, user_model):
+        """Valida senha e incrementa tentativas se inválida"""
+        if not await self.pass_manager.verify_async(
+            user.password, user_model.password
+        ):
+            await self._register_failed_attempt(
+                user_model, 'invalid user or password'
+            )
 
-            raise HTTPException(
-                status_code=401,
-                detail=message,
+        if self.pass_manager.needs_rehash(user_model.password):
+            task = asyncio.create_task(
+                _rehash_password(
+                    user_model.id, user.password, user_model.password
+                )
             )
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
 
     async def _setup_initial_otp(self, user_model):
         """Configura OTP inicial para usuário sem secret"""
         logger.info(f'User {user_model.id} has no secret_otp')
         secret_otp = self.otp_manager.generate_secret()
-        user_model.secret_otp = secret_otp
-        await save_and_refresh(self.session, user_model)
+        self.uow.set(user_model, secret_otp=secret_otp)
         return True
 
     async def _generate_otp_qr_response(
@@ -178,44 +257,37 @@ class UserController(ControllerPort):
     async def _verify_otp_code(self, user_model, totp: str):
         """Verifica código OTP"""
         if not self.otp_manager.verify_code(user_model.secret_otp, totp):
-            user_model.attempts += 1
-
-            await save_and_refresh(self.session, user_model)
-            rest_attemps = 3 - user_model.attempts
-
-            message = json.dumps(
-                {
-                    'message': 'invalid OTP',
-                    'rest_attemps': rest_attemps,
-                }
-            )
-            if rest_attemps == 0:
-                user_model.blocked = True
-                await save_and_refresh(self.session, user_model)
-            raise HTTPException(
-                status_code=401,
-                detail=message,
-            )
+            await self._register_failed_attempt(user_model, 'invalid OTP')
 
         if not user_model.otp:
-            user_model.otp = True
-            await save_and_refresh(self.session, user_model)
+            self.uow.set(user_model, otp=True)
 
     async def _finalize_login(self, user_model):
         """Finaliza login resetando tentativas e habilitando usuário"""
-        user_model.allowed = True
-        user_model.attempts = 0
-        await save_and_refresh(self.session, user_model)
+        self.uow.set(user_model, allowed=True, attempts=0, logged_in=True)
+        await self._commit(user_model)
+        await self.redis_manager.delete(self._attempts_key(user_model.id))
 
     async def create(self, user: SignUp):
-        already_exists = await self.repository.find(user)
+        await email_deliverability.check(user.email)
 
-        if already_exists:
-            logger.debug(f'User already exists {user}')
-            raise HTTPException(status_code=400, detail='User already exists')
+        # negativo do filtro: vai direto ao INSERT (o ON CONFLICT garante)
+        if signup_filter.might_exist(user.username, user.email):
+            already_exists = await self.repository.find(user)
 
-        user.password = self.pass_manager.hash(user.password)
+            if already_exists:
+                logger.debug(f'User already exists {user}')
+                raise HTTPException(
+                    status_code=400, detail='User already exists'
+                )
+            await release(self.session)
+
+        user.password = await self.pass_manager.hash_async(user.password)
         user = await self.repository.create(user)
+        if user is None:
+            raise HTTPException(status_code=400, detail='User already exists')
+
+        await signup_filter.add(user.username, user.email)
         logger.success(f'User created {user}')
         self.response.status_code = HTTPStatus.CREATED
         return user
@@ -235,6 +307,7 @@ class UserController(ControllerPort):
         if not user_model.otp and not totp:
             if not user_model.secret_otp:
                 await self._setup_initial_otp(user_model)
+                await self._commit(user_model)
             return await self._generate_otp_qr_response(user_model)
 
         # 5. Verificar se precisa validar OTP
@@ -247,16 +320,30 @@ class UserController(ControllerPort):
         if totp:
             await self._verify_otp_code(user_model, totp)
 
-        # 7. Finalizar login
+        # 7. Finalizar login (único UPDATE com tudo que mudou no fluxo)
         await self._finalize_login(user_model)
 
         # 8. Criar autenticação
-        user_model.logged_in = True
-        await save_and_refresh(self.session, user_model)
         return await create_auth(
             user_model, self.response, self.session_manager
         )
 
+    async def refresh(self, refresh_token: str) -> Authorization:
+        """Troca o refresh token por um novo par access/refresh"""
+        if not config.jwt.refresh_tokens:
+            raise HTTPException(status_code=404, detail='Not Found')
+
+        grant = await refresh_manager.rotate(refresh_token)
+        user = await user_cache.get(grant.user_id)
+        if user is None or user.blocked:
+            raise HTTPException(status_code=401, detail='Unauthorized')
+
+        authorization = jwt_manager.create(
+            _access_payload(user, grant.session_id)
+        )
+        authorization.refresh_token = grant.refresh_token
+        return authorization
+
     async def get(self, _id):
         return await self.repository.get(_id)
 
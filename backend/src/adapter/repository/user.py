@@ -1,9 +1,27 @@
+from typing import Optional
+
 from pydantic import BaseModel
-from sqlalchemy import or_, select
+from sqlalchemy import func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from src.core.domain.user import AuthPrincipal
 from src.core.ports.repository import RepositoryPort
+from src.infra.cache.user import user_cache
 from src.infra.database.model.user import UserModel
 from src.interfaces.schema.auth import SignUp
+from src.utils.helpers.sql import insert_or_ignore
+
+# colunas lidas no fluxo de login (senha, bloqueio, OTP e claims do token)
+SIGNIN_COLUMNS = (
+    UserModel.id,
+    UserModel.username,
+    UserModel.email,
+    UserModel.password,
+    UserModel.secret_otp,
+    UserModel.otp,
+    UserModel.blocked,
+    UserModel.attempts,
+)
 
 
 class UserRepository(RepositoryPort):
@@ -18,11 +36,51 @@ class UserRepository(RepositoryPort):
         )
         return data.scalars().first()
 
+    async def get_principal(self, _id) -> Optional[AuthPrincipal]:
+        """
+        Projeção do usuário para as dependências de auth
+        Seleciona só as colunas do AuthPrincipal e devolve tuplas (sem
+        hidratar UserModel nem passar pelo identity map da sessão)
+        Args:
+            _id: ID do usuário
+        Returns:
+            AuthPrincipal ou None se o usuário não existe
+        """
+        data = await self.session.execute(
+            select(
+                self.model.id,
+                self.model.username,
+                self.model.email,
+                self.model.blocked,
+                self.model.allowed,
+                self.model.updated_at,
+            ).where(self.model.id == _id)
+        )
+        row = data.first()
+        if row is None:
+            return None
+        return AuthPrincipal(
+            id=row.id,
+            username=row.username,
+            email=row.email,
+            blocked=row.blocked,
+            allowed=row.allowed,
+            version=AuthPrincipal.version_of(row.updated_at),
+        )
+
     async def create(self, user: SignUp):
-        model = self.model(**user.model_dump())
-        self.session.add(model)
+        """
+        Insere o usuário num único INSERT ... RETURNING
+        Returns:
+            Modelo criado ou None se username/email já existem
+        """
+        result = await self.session.execute(
+            insert_or_ignore(self.session, self.model)
+            .values(**user.model_dump())
+            .returning(self.model)
+        )
+        model = result.scalars().first()
         await self.session.commit()
-        await self.session.refresh(model)
         return model
 
     async def update(self, _id, data: dict | BaseModel):
@@ -43,6 +101,7 @@ class UserRepository(RepositoryPort):
 
         await self.session.commit()
         await self.session.refresh(model)
+        await user_cache.invalidate(_id)
         return model
 
     async def find(self, data):
@@ -55,3 +114,47 @@ class UserRepository(RepositoryPort):
             )
         )
         return data.scalars().all()
+
+    async def _find_by(self, column, value: str) -> Optional[UserModel]:
+        data = await self.session.execute(
+            select(self.model)
+            .options(load_only(*SIGNIN_COLUMNS))
+            .where(func.lower(column) == value)
+            .limit(1)
+        )
+        return data.scalars().first()
+
+    async def find_for_signin(self, identifier: str) -> Optional[UserModel]:
+        """
+        Busca o usuário do login por email ou username (sem diferenciar
+        maiúsculas)
+        Sem o OR de find: cada consulta usa um único índice (lower(email)
+        ou lower(username)) com LIMIT 1 e lê só as colunas do login
+        Args:
+            identifier: Email ou username informado no login
+        Returns:
+            Modelo parcial do usuário ou None
+        """
+        identifier = identifier.lower()
+        if '@' in identifier:
+            model = await self._find_by(self.model.email, identifier)
+            if model is not None:
+                return model
+        return await self._find_by(self.model.username, identifier)
+
+    async def update_password_hash(self, _id, old_hash: str, new_hash: str):
+        """
+        Troca o hash da senha apenas se ainda for o hash lido no login,
+        evitando sobrescrever uma troca de senha concorrente
+        """
+        result = await self.session.execute(
+            update(self.model)
+            .where(self.model.id == _id, self.model.password == old_hash)
+            .values(password=new_hash)
+        )
+        await self.session.commit()
+        if not result.rowcount:
+            return False
+        # updated_at mudou: a versão do AuthPrincipal em cache ficou velha
+        await user_cache.invalidate(_id)
+        return True
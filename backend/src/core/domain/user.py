@@ -1,11 +1,49 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass(frozen=True, slots=True)
+class AuthPrincipal:
+    """
+    Usuário autenticado como visto pelas dependências de auth
+    Somente leitura e sem dados sensíveis (senha, secret do OTP, documento)
+    version muda a cada UPDATE do usuário (deriva de updated_at)
+    """
+
+    id: int
+    username: str
+    email: str
+    blocked: bool
+    allowed: bool
+    version: int
+
+    @staticmethod
+    def version_of(updated_at: Optional[datetime]) -> int:
+        if updated_at is None:
+            return 0
+        return int(updated_at.timestamp() * 1_000_000)
+
+
 class UserBusinessRules:
     """Regras de negócio do usuário"""
 
+    MAX_ATTEMPTS = 3
+
     @staticmethod
-    def should_block_user(attempts: int, threshold: int = 3) -> bool:
+    def should_block_user(
+        attempts: int, threshold: int = MAX_ATTEMPTS
+    ) -> bool:
         """Determina se usuário deve ser bloqueado"""
         return attempts >= threshold
 
+    @staticmethod
+    def remaining_attempts(
+        attempts: int, threshold: int = MAX_ATTEMPTS
+    ) -> int:
+        """Tentativas restantes antes do bloqueio"""
+        return max(threshold - attempts, 0)
+
     @staticmethod
     def can_attempt_login(blocked: bool, allowed: bool) -> bool:
         """Verifica se usuário pode tentar login"""
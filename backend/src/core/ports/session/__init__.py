@@ -0,0 +1,74 @@
+from typing import Any, Dict, List, Optional, Protocol
+
+
+class SessionStorePort(Protocol):
+    """
+    Armazenamento de sessões (Redis ou memória do processo)
+    Mesma semântica em todos os backends: create/previous_session gravam a
+    sessão e o ponteiro do usuário, extend/logout atuam só em sessões vivas
+    """
+
+    def new_session_id(self, user_id) -> str:
+        pass
+
+    async def create(
+        self, session_id: str, data: Dict[str, Any], ttl: int
+    ) -> str:
+        pass
+
+    async def previous_session(
+        self, session_id: str, data: Dict[str, Any], ttl: int
+    ) -> bool:
+        pass
+
+    async def get_session_data(
+        self, session_id: str
+    ) -> Optional[Dict[str, Any]]:
+        pass
+
+    async def get_many_session_data(
+        self, session_ids
+    ) -> List[Optional[Dict[str, Any]]]:
+        pass
+
+    async def get_session_fields(
+        self, session_id: str, *fields: str
+    ) -> Optional[Dict[str, Any]]:
+        pass
+
+    async def update_session_fields(self, session_id: str, **fields) -> bool:
+        pass
+
+    async def get_user_session_id(self, user_id) -> Optional[str]:
+        pass
+
+    async def validate_session(
+        self, session_id: str
+    ) -> Optional[Dict[str, Any]]:
+        pass
+
+    async def extend_session(
+        self, session_id: str, ttl_seconds: int, user_id=None
+    ) -> bool:
+        pass
+
+    def touch(self, session_id: str, user_id) -> bool:
+        pass
+
+    async def logout_session(self, session_id: str, user_id=None) -> bool:
+        pass
+
+    async def logout_user(self, user_id) -> int:
+        pass
+
+    async def list_sessions(self, user_id) -> List[Dict[str, Any]]:
+        pass
+
+    async def revoke_session(self, user_id, session_id: str) -> bool:
+        pass
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
@@ -0,0 +1,129 @@
+"""
+Bloom filter de usernames e emails já cadastrados (por worker)
+
+Um "com certeza livre" do filtro dispensa a consulta ao banco antes do
+INSERT no cadastro. Positivos (e o filtro fora de sync) seguem para a
+consulta; o ON CONFLICT do INSERT cobre o que o filtro não viu
+"""
+
+import asyncio
+from typing import Optional
+
+import orjson
+from config import Cache, config, logger
+from sqlalchemy import func, select
+from src.infra.database.connect.redis import RedisManager, redis_manager
+from src.infra.metrics import metrics
+from src.utils.helpers.bloom import BloomFilter
+
+SIGNUP_FILTER_SKIPS = metrics.counter(
+    'signup_filter_skips_total',
+    'Cadastros que dispensaram a consulta de existência',
+)
+
+
+class SignupFilter:
+    CHANNEL = 'signup:taken'
+
+    def __init__(self, config: Cache, redis: RedisManager):
+        self.redis = redis
+        self.capacity = config.signup_filter_capacity
+        self.error_rate = config.signup_filter_error_rate
+        self.filter = BloomFilter(2 * self.capacity, self.error_rate)
+        # filtro só é confiável após a carga com o listener inscrito
+        self.synced = False
+        self._listener: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _keys(username: str, email: str) -> list[str]:
+        return [f'username:{username.lower()}', f'email:{email.lower()}']
+
+    @classmethod
+    def _fill(cls, bloom: BloomFilter, rows: list):
+        for username, email in rows:
+            bloom.update(cls._keys(username, email))
+
+    def might_exist(self, username: str, email: str) -> bool:
+        """False apenas se username e email com certeza estão livres"""
+        if not self.synced:
+            return True
+        if any(key in self.filter for key in self._keys(username, email)):
+            return True
+        SIGNUP_FILTER_SKIPS.inc()
+        return False
+
+    async def add(self, username: str, email: str):
+        """Marca como cadastrados neste worker e avisa os demais"""
+        keys = self._keys(username, email)
+        self.filter.update(keys)
+        try:
+            await self.redis.redis.publish(self.CHANNEL, orjson.dumps(keys))
+        except Exception as e:
+            # nos demais workers o ON CONFLICT do INSERT continua valendo
+            logger.warning(f'Signup filter update not published: {e}')
+
+    async def _rebuild(self):
+        """
+        Recria o filtro lendo a tabela users em lotes
+        O hash de cada lote roda no executor padrão; até o fim da carga o
+        filtro não está em sync e o cadastro consulta o banco
+        """
+        # abre sessão no banco apenas na carga do filtro
+        from src.infra.database.connect.sql import Session
+        from src.infra.database.model.user import UserModel
+
+        async with Session() as session:
+            total = await session.scalar(
+                select(func.count()).select_from(UserModel)
+            )
+            # duas chaves (username e email) por usuário
+            bloom = BloomFilter(2 * max(self.capacity, total), self.error_rate)
+            result = await session.stream(
+                select(UserModel.username, UserModel.email).execution_options(
+                    yield_per=5000
+                )
+            )
+            loop = asyncio.get_running_loop()
+            async for rows in result.partitions():
+                await loop.run_in_executor(None, self._fill, bloom, rows)
+
+        self.filter = bloom
+        logger.info(f'Signup filter built: {len(bloom) // 2} users')
+
+    async def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                # inscreve antes da carga: o que chegar durante ela fica na fila
+                await pubsub.subscribe(self.CHANNEL)
+                await self._rebuild()
+                self.synced = True
+
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        self.filter.update(orjson.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f'Signup filter listener error: {e}')
+                await asyncio.sleep(1)
+            finally:
+                self.synced = False
+                await pubsub.aclose()
+
+    def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+# singleton
+signup_filter = SignupFilter(config.cache, redis_manager)
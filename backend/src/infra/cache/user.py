@@ -0,0 +1,130 @@
+import asyncio
+from typing import Optional
+
+from config import Cache, config, logger
+from src.core.domain.user import AuthPrincipal
+from src.infra.cache import TTLCache
+from src.infra.database.connect.redis import RedisManager, redis_manager
+from src.infra.metrics import metrics
+
+USER_CACHE_HITS = metrics.counter(
+    'user_cache_hits_total', 'Usuários servidos do cache em memória'
+)
+USER_CACHE_MISSES = metrics.counter(
+    'user_cache_misses_total', 'Usuários carregados do banco'
+)
+
+
+class UserCache:
+    """
+    Cache por worker de AuthPrincipal (TTL + LRU)
+    Alterações no usuário publicam o id no canal CHANNEL; todos os workers
+    assinam o canal e descartam a entrada
+    """
+
+    CHANNEL = 'user_cache:invalidate'
+
+    def __init__(self, config: Cache, redis: RedisManager):
+        self.cache = TTLCache(
+            max_size=config.user_cache_max_size, ttl=config.user_cache_ttl
+        )
+        self.redis = redis
+        self._loading: dict[int, asyncio.Future] = {}
+        self._invalidations = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    async def _load(self, user_id: int) -> Optional[AuthPrincipal]:
+        # abre sessão no banco apenas quando o cache falha
+        from src.adapter.repository.user import UserRepository
+        from src.infra.database.connect.sql import Session
+
+        async with Session() as session:
+            return await UserRepository(session).get_principal(user_id)
+
+    async def get(self, user_id: int) -> Optional[AuthPrincipal]:
+        """
+        Busca o usuário no cache ou no banco
+        Args:
+            user_id: ID do usuário
+        Returns:
+            AuthPrincipal ou None se o usuário não existe
+        """
+        user = self.cache.get(user_id)
+        if user is not None:
+            USER_CACHE_HITS.inc()
+            return user
+
+        # requisições simultâneas do mesmo usuário compartilham a consulta
+        if user_id in self._loading:
+            return await asyncio.shield(self._loading[user_id])
+
+        USER_CACHE_MISSES.inc()
+        future = asyncio.get_running_loop().create_future()
+        self._loading[user_id] = future
+        invalidations = self._invalidations
+        try:
+            user = await self._load(user_id)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # marca como lida se ninguém aguardava
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._loading.pop(user_id, None)
+
+        # invalidação chegou durante a consulta: não guarda dado velho
+        if user is not None and invalidations == self._invalidations:
+            self.cache.set(user_id, user)
+        future.set_result(user)
+        return user
+
+    def evict(self, user_id: int):
+        self._invalidations += 1
+        self.cache.pop(user_id)
+
+    async def invalidate(self, user_id: int):
+        """Descarta o usuário neste worker e avisa os demais via pub/sub"""
+        self.evict(user_id)
+        try:
+            await self.redis.redis.publish(self.CHANNEL, user_id)
+        except Exception as e:
+            logger.warning(f'User cache invalidation not published: {e}')
+
+    async def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.CHANNEL)
+                # mensagens podem ter sido perdidas enquanto desconectado
+                self._invalidations += 1
+                self.cache.clear()
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        self.evict(int(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f'User cache listener error: {e}')
+                self.cache.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+# singleton
+user_cache = UserCache(config.cache, redis_manager)
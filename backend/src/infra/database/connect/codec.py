@@ -0,0 +1,81 @@
+"""
+Codecs dos dados de sessão gravados no Redis
+
+Formato versionado pelo primeiro byte, para sessões antigas continuarem
+legíveis depois de trocar o codec:
+    '{'   JSON (json ou orjson), formato original
+    0x01  msgpack
+Os scripts Lua gravam e copiam o payload sem decodificá-lo; só o
+SessionManager (Python) lê o formato
+"""
+
+import json
+from typing import Any, Dict
+
+import orjson
+
+MSGPACK_MARKER = b'\x01'
+
+
+class JSONCodec:
+    name = 'json'
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        return json.dumps(data).encode('utf-8')
+
+
+class ORJSONCodec:
+    name = 'orjson'
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        return orjson.dumps(data)
+
+
+class MsgpackCodec:
+    name = 'msgpack'
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise RuntimeError(
+                'codec msgpack requer o pacote msgpack instalado'
+            ) from e
+        self.msgpack = msgpack
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        return MSGPACK_MARKER + self.msgpack.packb(data)
+
+
+CODECS = {
+    JSONCodec.name: JSONCodec,
+    ORJSONCodec.name: ORJSONCodec,
+    MsgpackCodec.name: MsgpackCodec,
+}
+
+
+class SessionCodec:
+    """
+    Codifica com o codec configurado e decodifica qualquer versão conhecida
+    """
+
+    def __init__(self, name: str = 'json'):
+        if name not in CODECS:
+            raise ValueError(f'Codec de sessão desconhecido: {name}')
+        self.codec = CODECS[name]()
+        self._msgpack = None
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        return self.codec.encode(data)
+
+    def decode(self, data: bytes | str) -> Dict[str, Any]:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        if data[:1] == MSGPACK_MARKER:
+            if self._msgpack is None:
+                self._msgpack = MsgpackCodec().msgpack
+            return self._msgpack.unpackb(data[1:])
+
+        # orjson lê tanto o que o json quanto o próprio orjson gravaram
+        return orjson.loads(data)
@@ -0,0 +1,281 @@
+"""
+Scripts Lua usados pelos managers do Redis
+Todas as chaves tocadas são declaradas em KEYS[]. Scripts com mais de uma
+chave só rodam em cluster se elas compartilham a hash tag: {escopo} no
+rate limit e {user_id} nas sessões (session_id com a tag só quando
+REDIS_SHARDS está configurado); os demais tocam uma única chave
+"""
+
+# INCR atômico; uma chave nova parte de ARGV[2] (valor inicial) e recebe
+# o TTL ARGV[1] no primeiro incremento (0 = sem expiração)
+INCR_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    local value = redis.call('INCRBY', KEYS[1], tonumber(ARGV[2]) + 1)
+    if tonumber(ARGV[1]) > 0 then
+        redis.call('EXPIRE', KEYS[1], tonumber(ARGV[1]))
+    end
+    return value
+end
+return redis.call('INCR', KEYS[1])
+"""
+
+
+# Scripts Lua de sessão
+# KEYS: session:<session_id>, user_session:<user_id>, user_sessions:<user_id>
+#       (+ chave da sessão antiga ou, sem ela, de novo user_session)
+# ARGV: session_id, ttl, layout, [...], now, payload
+#   layout 'string': payload é o blob codificado (SETEX)
+#   layout 'hash':   payload são pares campo/valor (HSET)
+#   now: epoch em ms do cliente, usado no índice de sessões do usuário
+WRITE_SESSION_LUA = """
+local function write_session(key, ttl, layout, first)
+    if layout == 'hash' then
+        redis.call('DEL', key)
+        redis.call('HSET', key, unpack(ARGV, first))
+        redis.call('EXPIRE', key, ttl)
+    else
+        redis.call('SETEX', key, ttl, ARGV[first])
+    end
+end
+"""
+
+# user_sessions:<user_id> é um sorted set session_id -> expiração (ms);
+# membros vencidos são removidos a cada escrita e o índice expira junto
+# com a última sessão
+INDEX_SESSION_LUA = """
+local function index_session(index, session_id, ttl, now)
+    redis.call('ZREMRANGEBYSCORE', index, '-inf', now)
+    redis.call('ZADD', index, now + ttl * 1000, session_id)
+    local last = redis.call('ZRANGE', index, -1, -1, 'WITHSCORES')
+    redis.call('PEXPIREAT', index, last[2])
+end
+"""
+
+CREATE_SESSION_SCRIPT = (
+    WRITE_SESSION_LUA
+    + INDEX_SESSION_LUA
+    + """
+local session_id = ARGV[1]
+local ttl = tonumber(ARGV[2])
+
+-- Cria nova sessão
+write_session(KEYS[1], ttl, ARGV[3], 5)
+redis.call('SETEX', KEYS[2], ttl, session_id)
+index_session(KEYS[3], session_id, ttl, tonumber(ARGV[4]))
+
+return session_id
+"""
+)
+
+PREVIOUS_SESSION_SCRIPT = (
+    WRITE_SESSION_LUA
+    + INDEX_SESSION_LUA
+    + """
+local session_id = ARGV[1]
+local ttl = tonumber(ARGV[2])
+local expected_old = ARGV[4]
+
+-- O ponteiro mudou desde a leitura: o cliente relê e tenta de novo
+local old_session = redis.call('GET', KEYS[2]) or ''
+if old_session ~= expected_old then
+    return -1
+end
+
+-- Remove sessão anterior se existir
+local removed = 0
+if old_session ~= '' then
+    removed = redis.call('DEL', KEYS[4])
+    redis.call('ZREM', KEYS[3], old_session)
+end
+
+-- Cria nova sessão
+write_session(KEYS[1], ttl, ARGV[3], 6)
+redis.call('SETEX', KEYS[2], ttl, session_id)
+index_session(KEYS[3], session_id, ttl, tonumber(ARGV[5]))
+
+return removed
+"""
+)
+
+LOGOUT_SESSION_SCRIPT = """
+local session_id = ARGV[1]
+
+redis.call('ZREM', KEYS[3], session_id)
+if redis.call('DEL', KEYS[1]) == 0 then
+    return 0
+end
+
+-- Só remove o ponteiro do usuário se ele ainda aponta para esta sessão
+if redis.call('GET', KEYS[2]) == session_id then
+    redis.call('DEL', KEYS[2])
+end
+
+return 1
+"""
+
+# Logout global: remove as sessões lidas do índice pelo cliente
+# KEYS: user_session:<user_id>, user_sessions:<user_id>, session:<id>...
+# ARGV: now, session_id...
+# Retorna {removidas, restantes}; restantes > 0 indica login concorrente
+# e o cliente repete com os novos membros
+LOGOUT_USER_SCRIPT = """
+local removed = 0
+for i = 3, #KEYS do
+    removed = removed + redis.call('DEL', KEYS[i])
+    redis.call('ZREM', KEYS[2], ARGV[i - 1])
+end
+redis.call('DEL', KEYS[1])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+local remaining = redis.call('ZCARD', KEYS[2])
+if remaining == 0 then
+    redis.call('DEL', KEYS[2])
+end
+return {removed, remaining}
+"""
+
+EXTEND_SESSION_SCRIPT = (
+    INDEX_SESSION_LUA
+    + """
+local session_id = ARGV[1]
+local ttl = tonumber(ARGV[2])
+
+if redis.call('EXPIRE', KEYS[1], ttl) == 0 then
+    return 0
+end
+
+if redis.call('GET', KEYS[2]) == session_id then
+    redis.call('EXPIRE', KEYS[2], ttl)
+end
+
+-- também indexa sessões criadas antes do índice existir
+index_session(KEYS[3], session_id, ttl, tonumber(ARGV[3]))
+
+return 1
+"""
+)
+
+# Expiração deslizante: só estende quando o TTL restante caiu abaixo do
+# limite; chamado em lote (pipeline) pelo SessionToucher
+# KEYS: session:<id>, user_session:<user_id>, user_sessions:<user_id>
+# ARGV: session_id, ttl, threshold (ms), now
+# Retorna o TTL restante em ms após o toque (< 0 se a sessão não existe)
+TOUCH_SESSION_SCRIPT = (
+    INDEX_SESSION_LUA
+    + """
+local session_id = ARGV[1]
+local ttl = tonumber(ARGV[2])
+
+local pttl = redis.call('PTTL', KEYS[1])
+if pttl < 0 or pttl >= tonumber(ARGV[3]) then
+    return pttl
+end
+
+redis.call('EXPIRE', KEYS[1], ttl)
+if redis.call('GET', KEYS[2]) == session_id then
+    redis.call('EXPIRE', KEYS[2], ttl)
+end
+index_session(KEYS[3], session_id, ttl, tonumber(ARGV[4]))
+
+return ttl * 1000
+"""
+)
+
+# Atualiza campos de uma sessão em hash sem recriar a chave expirada
+UPDATE_SESSION_FIELDS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+return 1
+"""
+
+# Converte uma sessão string (blob) em hash mantendo o TTL restante;
+# só converte se o blob ainda for o lido pelo cliente
+MIGRATE_SESSION_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+local ttl = redis.call('PTTL', KEYS[1])
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+if ttl > 0 then
+    redis.call('PEXPIRE', KEYS[1], ttl)
+end
+return 1
+"""
+
+# Rotação do refresh token (família = sequência de tokens de um login)
+# KEYS: refresh_family:<family>
+# ARGV: hash do token apresentado, hash do novo token, ttl
+# Retorna {1, user_id, session_id} ao rotacionar, {-1, user_id, session_id}
+# se um token já rotacionado foi reapresentado (família revogada) ou 0
+ROTATE_REFRESH_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'current')
+if not current then
+    return 0
+end
+
+local owner = redis.call('HMGET', KEYS[1], 'user_id', 'session_id')
+if current ~= ARGV[1] then
+    -- reuso: o token vazou ou foi roubado; derruba a família inteira
+    redis.call('DEL', KEYS[1])
+    return {-1, owner[1], owner[2]}
+end
+
+redis.call('HSET', KEYS[1], 'current', ARGV[2])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return {1, owner[1], owner[2]}
+"""
+
+# Janela deslizante aproximada (contador da janela atual + anterior
+# ponderado pelo tempo que falta): um hash pequeno por limite, em vez de
+# um sorted set com cada requisição
+# KEYS: rate_limit:{<escopo>}:... (um por limite, mesma hash tag)
+# ARGV: janela em ms, limite de cada chave (na ordem de KEYS)
+# Só conta a requisição se ela couber em todos os limites; retorna 0 ou o
+# tempo em ms até caber. O relógio é o do Redis, comum a todos os workers
+RATE_LIMIT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local window = tonumber(ARGV[1])
+local current = math.floor(now / window)
+local elapsed = now - current * window
+local weight = 1 - elapsed / window
+
+local counts = {}
+local retry = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i + 1])
+    local state = redis.call('HMGET', key, 'w', 'c', 'p')
+    local w = tonumber(state[1])
+    local c = tonumber(state[2]) or 0
+    local p = tonumber(state[3]) or 0
+    if w == current - 1 then
+        p, c = c, 0
+    elseif w ~= current then
+        p, c = 0, 0
+    end
+    counts[i] = {c, p}
+
+    if p * weight + c + 1 > limit then
+        local wait
+        if c + 1 > limit then
+            -- só na próxima janela, quando c passa a pesar como anterior
+            wait = window - elapsed + math.max(0, window * (1 - (limit - 1) / c))
+        else
+            wait = window * (1 - (limit - c - 1) / p) - elapsed
+        end
+        retry = math.max(retry, math.ceil(wait), 1)
+    end
+end
+if retry > 0 then
+    return retry
+end
+
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, 'w', current, 'c', counts[i][1] + 1, 'p', counts[i][2])
+    redis.call('PEXPIRE', key, window * 2)
+end
+return 0
+"""
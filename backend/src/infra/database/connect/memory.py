@@ -0,0 +1,198 @@
+"""
+Sessões na memória do processo
+
+Para deploys de um único worker (edge) e benchmarks: sem round-trip de
+rede na validação. As sessões não são compartilhadas entre workers nem
+sobrevivem a um restart
+"""
+
+import copy
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import logger
+from src.utils import get_uuid
+
+
+@dataclass
+class _Entry:
+    user_id: Any
+    data: Dict[str, Any]
+    expires_at: float  # time.time(), como os scores do índice no Redis
+
+
+class MemorySessionStore:
+    """
+    SessionStorePort em memória com TTL por sessão e limite de entradas
+    Acima de max_entries a sessão usada há mais tempo é descartada (LRU)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100000,
+        sliding: bool = False,
+        sliding_ttl: int = 3600,
+        sliding_threshold: int = 900,
+    ):
+        self.max_entries = max_entries
+        self.sliding = sliding
+        self.sliding_ttl = sliding_ttl
+        self.sliding_threshold = sliding_threshold
+        self._sessions: OrderedDict[str, _Entry] = OrderedDict()
+        self._pointers: dict[Any, str] = {}
+        self._users: dict[Any, set[str]] = {}
+
+    def _get(self, session_id: str) -> Optional[_Entry]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(session_id)
+            return None
+        self._sessions.move_to_end(session_id)
+        return entry
+
+    def _remove(self, session_id: str) -> bool:
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return False
+
+        sessions = self._users.get(entry.user_id)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del self._users[entry.user_id]
+        if self._pointers.get(entry.user_id) == session_id:
+            del self._pointers[entry.user_id]
+        return True
+
+    def _put(self, session_id: str, data: Dict[str, Any], ttl: int):
+        user_id = data['id']
+        self._remove(session_id)
+        self._sessions[session_id] = _Entry(
+            user_id=user_id,
+            data=copy.deepcopy(data),
+            expires_at=time.time() + ttl,
+        )
+        self._users.setdefault(user_id, set()).add(session_id)
+        self._pointers[user_id] = session_id
+
+        while len(self._sessions) > self.max_entries:
+            oldest = next(iter(self._sessions))
+            self._remove(oldest)
+
+    def new_session_id(self, user_id) -> str:
+        return get_uuid()
+
+    async def create(
+        self, session_id: str, data: Dict[str, Any], ttl: int
+    ) -> str:
+        self._put(session_id, data, ttl)
+        logger.info(f'Session created: {session_id}')
+        return session_id
+
+    async def previous_session(
+        self, session_id: str, data: Dict[str, Any], ttl: int
+    ) -> bool:
+        old_session = self._pointers.get(data['id'])
+        removed = old_session is not None and self._remove(old_session)
+        self._put(session_id, data, ttl)
+        logger.info(f'Session created: {session_id} {int(removed)}')
+        return removed
+
+    async def get_session_data(
+        self, session_id: str
+    ) -> Optional[Dict[str, Any]]:
+        entry = self._get(session_id)
+        # cópia: quem chama não altera a sessão guardada
+        return dict(entry.data) if entry else None
+
+    async def get_many_session_data(
+        self, session_ids: Iterable[str]
+    ) -> List[Optional[Dict[str, Any]]]:
+        return [await self.get_session_data(sid) for sid in session_ids]
+
+    async def get_session_fields(
+        self, session_id: str, *fields: str
+    ) -> Optional[Dict[str, Any]]:
+        entry = self._get(session_id)
+        if entry is None:
+            return None
+        return {f: entry.data.get(f) for f in fields}
+
+    async def update_session_fields(self, session_id: str, **fields) -> bool:
+        entry = self._get(session_id)
+        if entry is None:
+            return False
+        entry.data.update(copy.deepcopy(fields))
+        return True
+
+    async def get_user_session_id(self, user_id) -> Optional[str]:
+        session_id = self._pointers.get(user_id)
+        if session_id is None or self._get(session_id) is None:
+            return None
+        return session_id
+
+    async def validate_session(
+        self, session_id: str
+    ) -> Optional[Dict[str, Any]]:
+        return await self.get_session_data(session_id)
+
+    async def extend_session(
+        self, session_id: str, ttl_seconds: int = 3600, user_id=None
+    ) -> bool:
+        entry = self._get(session_id)
+        if entry is None:
+            return False
+        entry.expires_at = time.time() + ttl_seconds
+        return True
+
+    def touch(self, session_id: str, user_id) -> bool:
+        """Expiração deslizante sem lote: em memória estender é barato"""
+        if not self.sliding:
+            return False
+        entry = self._get(session_id)
+        if entry is None:
+            return False
+        if entry.expires_at - time.time() >= self.sliding_threshold:
+            return False
+        entry.expires_at = time.time() + self.sliding_ttl
+        return True
+
+    async def logout_session(self, session_id: str, user_id=None) -> bool:
+        if self._get(session_id) is None:
+            return False
+        return self._remove(session_id)
+
+    async def logout_user(self, user_id) -> int:
+        removed = 0
+        for session_id in list(self._users.get(user_id, ())):
+            if self._get(session_id) is not None:
+                removed += self._remove(session_id)
+        return removed
+
+    async def list_sessions(self, user_id) -> List[Dict[str, Any]]:
+        sessions = []
+        for session_id in list(self._users.get(user_id, ())):
+            entry = self._get(session_id)
+            if entry is not None:
+                sessions.append(
+                    {'session_id': session_id, 'expires_at': entry.expires_at}
+                )
+        return sorted(sessions, key=lambda s: s['expires_at'])
+
+    async def revoke_session(self, user_id, session_id: str) -> bool:
+        entry = self._get(session_id)
+        if entry is None or entry.user_id != user_id:
+            return False
+        return self._remove(session_id)
+
+    async def start(self):
+        logger.info('Sessions stored in process memory')
+
+    async def stop(self):
+        self._sessions.clear()
+        self._pointers.clear()
+        self._users.clear()
@@ -1,23 +1,345 @@
-import json
-from typing import Any, Dict, Optional
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
 
+import orjson
 import redis.asyncio as redis
 from config import Redis, config, logger
+from redis.asyncio.client import NEVER_DECODE
+from redis.asyncio.retry import Retry
+from redis.backoff import EqualJitterBackoff
+from src.infra.cache import TTLCache
+from src.infra.database.connect.codec import SessionCodec
+from src.infra.database.connect.lua import (
+    CREATE_SESSION_SCRIPT,
+    EXTEND_SESSION_SCRIPT,
+    INCR_SCRIPT,
+    LOGOUT_SESSION_SCRIPT,
+    LOGOUT_USER_SCRIPT,
+    MIGRATE_SESSION_SCRIPT,
+    PREVIOUS_SESSION_SCRIPT,
+    RATE_LIMIT_SCRIPT,
+    TOUCH_SESSION_SCRIPT,
+    UPDATE_SESSION_FIELDS_SCRIPT,
+)
+from src.infra.database.connect.shard import HashRing, parse_node, tag
+from src.infra.metrics import metrics
+from src.utils import get_uuid
 
+NEAR_CACHE_HITS = metrics.counter(
+    'redis_near_cache_hits_total', 'Leituras servidas pelo near-cache'
+)
+NEAR_CACHE_MISSES = metrics.counter(
+    'redis_near_cache_misses_total', 'Leituras que foram ao Redis'
+)
+NEAR_CACHE_INVALIDATIONS = metrics.counter(
+    'redis_near_cache_invalidations_total',
+    'Chaves invalidadas pelo CLIENT TRACKING',
+)
 
-class RedisManager:
+SESSION_TOUCHES = metrics.counter(
+    'redis_session_touches_total',
+    'Sessões verificadas pelo toque deslizante (em lote)',
+)
+SESSION_EXTENDS = metrics.counter(
+    'redis_session_extends_total',
+    'Sessões estendidas pelo toque deslizante',
+)
+
+# pools compartilhados por destino (host, porta, db)
+_pools: dict[tuple, redis.BlockingConnectionPool] = {}
+_pubsub_pools: dict[redis.ConnectionPool, redis.ConnectionPool] = {}
+
+metrics.gauge(
+    'redis_pool_in_use',
+    'Conexões Redis em uso',
+    lambda: sum(len(p._in_use_connections) for p in _pools.values()),
+)
+metrics.gauge(
+    'redis_pool_available',
+    'Conexões Redis ociosas nos pools',
+    lambda: sum(len(p._available_connections) for p in _pools.values()),
+)
+metrics.gauge(
+    'redis_pool_max',
+    'Limite de conexões Redis somando os pools',
+    lambda: sum(p.max_connections for p in _pools.values()),
+)
+metrics.gauge(
+    'redis_pubsub_connections',
+    'Conexões Redis abertas para pub/sub (fora dos pools limitados)',
+    lambda: sum(len(p._in_use_connections) for p in _pubsub_pools.values()),
+)
+
+
+def get_pool(config: Redis) -> redis.BlockingConnectionPool:
     """
-    Classe genérica para manipulação do Redis
+    Pool de conexões compartilhado entre todos os managers do mesmo destino
+    Bloqueante: acima de max_connections a requisição aguarda uma conexão
+    livre por até pool_timeout em vez de abrir sockets sem limite
     """
-
-    def __init__(self, config: Redis):
-        self.redis = redis.Redis(
-            password=config.password,
+    key = (config.host, str(config.port), config.db)
+    if key not in _pools:
+        pool = redis.BlockingConnectionPool(
             host=config.host,
             port=config.port,
             db=config.db,
+            username=config.username or None,
+            password=config.password or None,
             decode_responses=True,
+            max_connections=config.max_connections,
+            timeout=config.pool_timeout,
+            socket_timeout=config.socket_timeout,
+            socket_connect_timeout=config.socket_connect_timeout,
+            socket_keepalive=True,
+            health_check_interval=config.health_check_interval,
+            retry=Retry(
+                EqualJitterBackoff(
+                    cap=config.retry_backoff_cap,
+                    base=config.retry_backoff_base,
+                ),
+                config.retries,
+            ),
         )
+        _pools[key] = pool
+    return _pools[key]
+
+
+def get_pubsub_pool(pool: redis.ConnectionPool) -> redis.ConnectionPool:
+    """
+    Pool sem limite para as conexões de pub/sub do mesmo destino de pool
+    Cada listener segura a conexão enquanto está inscrito; fora do
+    BlockingConnectionPool elas não ocupam as vagas das requisições
+    (uma conexão por listener e por worker, fora de max_connections)
+    """
+    if pool not in _pubsub_pools:
+        _pubsub_pools[pool] = redis.ConnectionPool(
+            connection_class=pool.connection_class, **pool.connection_kwargs
+        )
+    return _pubsub_pools[pool]
+
+
+async def close_pools():
+    """Fecha todas as conexões dos pools (shutdown da aplicação)"""
+    for pool in [*_pools.values(), *_pubsub_pools.values()]:
+        await pool.aclose()
+    _pools.clear()
+    _pubsub_pools.clear()
+
+
+class NearCache:
+    """
+    Cache local de chaves do Redis invalidado pelo servidor (CLIENT TRACKING)
+
+    Usa duas conexões dedicadas: uma assina __redis__:invalidate e a outra
+    liga o tracking em modo BCAST para os prefixos configurados, com as
+    invalidações redirecionadas para a primeira. Assim qualquer escrita
+    nessas chaves (de qualquer cliente) ou expiração remove a entrada local.
+    Enquanto o tracking não está ativo o cache é ignorado
+    """
+
+    CHANNEL = '__redis__:invalidate'
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        prefixes: list[str],
+        max_entries: int,
+        ttl: int,
+        health_check_interval: int = 5,
+    ):
+        self.client = client
+        self.prefixes = prefixes
+        self.cache = TTLCache(max_size=max_entries, ttl=ttl)
+        self.health_check_interval = health_check_interval
+        self.active = False
+        self._epoch = 0
+        self._loading: dict[str, int] = {}
+        self._stale: set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+        metrics.gauge(
+            'redis_near_cache_entries',
+            'Chaves mantidas no near-cache',
+            lambda: len(self.cache),
+        )
+
+    def tracks(self, key: str) -> bool:
+        return key.startswith(tuple(self.prefixes))
+
+    async def get(self, key: str, loader: Callable[[str], Awaitable[Any]]):
+        """
+        Busca a chave no cache local ou via loader
+        Args:
+            key: Chave do Redis
+            loader: Função que lê a chave do Redis (e decodifica, se for o caso)
+        Returns:
+            Valor retornado pelo loader (compartilhado; não modificar)
+        """
+        if self.active:
+            value = self.cache.get(key)
+            if value is not None:
+                NEAR_CACHE_HITS.inc()
+                return value
+
+        NEAR_CACHE_MISSES.inc()
+        epoch = self._epoch
+        self._loading[key] = self._loading.get(key, 0) + 1
+        try:
+            value = await loader(key)
+            # invalidação chegou enquanto a leitura estava em voo
+            stale = key in self._stale or epoch != self._epoch
+        finally:
+            self._loading[key] -= 1
+            if not self._loading[key]:
+                del self._loading[key]
+                self._stale.discard(key)
+
+        if value is not None and self.active and not stale:
+            self.cache.set(key, value)
+        return value
+
+    def _invalidate(self, keys: Optional[list[str]]):
+        if keys is None:
+            # FLUSHDB/FLUSHALL ou perda do tracking: descarta tudo
+            self._epoch += 1
+            self.cache.clear()
+            return
+
+        NEAR_CACHE_INVALIDATIONS.inc(len(keys))
+        for key in keys:
+            self.cache.pop(key)
+            if key in self._loading:
+                self._stale.add(key)
+
+    def _connection(self) -> redis.Connection:
+        kwargs = dict(self.client.connection_pool.connection_kwargs)
+        kwargs['protocol'] = 2
+        return redis.Connection(**kwargs)
+
+    async def _track(self):
+        listener = self._connection()
+        tracker = self._connection()
+        try:
+            await listener.connect()
+            await listener.send_command('CLIENT', 'ID')
+            client_id = await listener.read_response()
+
+            await listener.send_command('SUBSCRIBE', self.CHANNEL)
+            await listener.read_response()
+
+            prefixes = []
+            for prefix in self.prefixes:
+                prefixes += ['PREFIX', prefix]
+            await tracker.connect()
+            await tracker.send_command(
+                'CLIENT',
+                'TRACKING',
+                'ON',
+                'REDIRECT',
+                client_id,
+                'BCAST',
+                *prefixes,
+            )
+            await tracker.read_response()
+
+            self.active = True
+            logger.info(f'Near-cache tracking {self.prefixes}')
+            last_seen = time.monotonic()
+
+            while True:
+                message = await listener.read_response(
+                    timeout=self.health_check_interval
+                )
+                if message is not None:
+                    last_seen = time.monotonic()
+                    if message[0] == 'message':
+                        self._invalidate(message[2])
+                    continue
+
+                # silêncio: confirma que as duas conexões seguem vivas
+                if (
+                    time.monotonic() - last_seen
+                    > 3 * self.health_check_interval
+                ):
+                    raise redis.ConnectionError('near-cache listener stalled')
+                await tracker.send_command('PING')
+                await tracker.read_response()
+                await listener.send_command('PING')
+        finally:
+            self.active = False
+            self._invalidate(None)
+            await listener.disconnect()
+            await tracker.disconnect()
+
+    async def _run(self):
+        while True:
+            try:
+                await self._track()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f'Near-cache tracking lost: {e}')
+                await asyncio.sleep(1)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class RedisManager:
+    """
+    Classe genérica para manipulação do Redis
+    """
+
+    def __init__(self, config: Redis, near_cache: bool = False):
+        self.redis = redis.Redis(connection_pool=get_pool(config))
+        self.incr_script = self.redis.register_script(INCR_SCRIPT)
+        self.rate_limit_script = self.redis.register_script(RATE_LIMIT_SCRIPT)
+
+        # near-cache opcional (CLIENT TRACKING); ativo só após start()
+        self.near_cache: Optional[NearCache] = None
+        if near_cache and config.near_cache:
+            self.near_cache = NearCache(
+                self.redis,
+                prefixes=config.near_cache_prefixes,
+                max_entries=config.near_cache_max_entries,
+                ttl=config.near_cache_ttl,
+            )
+
+    def node(self, key: str) -> redis.Redis:
+        """Cliente responsável pela chave (único fora do modo sharded)"""
+        return self.redis
+
+    @property
+    def nodes(self) -> List[redis.Redis]:
+        return [self.redis]
+
+    def _group(self, keys: List[str]) -> Dict[redis.Redis, List[int]]:
+        """Índices das chaves agrupados pelo nó que as guarda"""
+        groups: Dict[redis.Redis, List[int]] = {}
+        for i, key in enumerate(keys):
+            groups.setdefault(self.node(key), []).append(i)
+        return groups
 
     async def insert(
         self, key: str, value: str | int | Dict[str, Any], time: int
@@ -30,21 +352,57 @@ class RedisManager:
             time: Tempo de vida em segundos
         """
         if isinstance(value, dict):
-            value = json.dumps(value)
+            value = orjson.dumps(value)
 
-        await self.redis.setex(name=str(key), time=time, value=value)
+        await self.node(str(key)).setex(name=str(key), time=time, value=value)
 
-    async def search(self, key: str) -> Optional[str]:
+    async def search(self, key: str, raw: bool = False) -> Optional[str]:
         """
         Função genérica para buscar dados
         Args:
             key: Chave do Redis
+            raw: Retorna bytes sem decodificar (valores binários)
         Returns:
             Valor encontrado ou None
         """
-        result = await self.redis.get(key)
+        client = self.node(key)
+        if raw:
+            return await client.execute_command(
+                'GET', key, **{NEVER_DECODE: True}
+            )
+        result = await client.get(key)
         return result
 
+    async def cached_search(
+        self,
+        key: str,
+        decode: Callable[[str | bytes], Any] = lambda v: v,
+        raw: bool = False,
+    ) -> Any:
+        """
+        Busca passando pelo near-cache quando habilitado para a chave
+        Args:
+            key: Chave do Redis
+            decode: Conversão aplicada antes de guardar no cache local
+            raw: Lê bytes sem decodificar (valores binários)
+        Returns:
+            Valor decodificado ou None
+        """
+
+        async def load(key: str):
+            value = await self.search(key, raw=raw)
+            return decode(value) if value is not None else None
+
+        return await self.cached(key, load)
+
+    async def cached(
+        self, key: str, loader: Callable[[str], Awaitable[Any]]
+    ) -> Any:
+        """Executa o loader passando pelo near-cache quando habilitado"""
+        if self.near_cache and self.near_cache.tracks(key):
+            return await self.near_cache.get(key, loader)
+        return await loader(key)
+
     async def delete(self, key: str) -> bool:
         """
         Função genérica para deletar dados
@@ -53,7 +411,7 @@ class RedisManager:
         Returns:
             True se deletado, False se não existia
         """
-        result = await self.redis.delete(key)
+        result = await self.node(key).delete(key)
         return bool(result)
 
     async def expire(self, key: str, time: int) -> bool:
@@ -65,96 +423,573 @@ class RedisManager:
         Returns:
             True se definido, False se chave não existe
         """
-        result = await self.redis.expire(key, time)
+        result = await self.node(key).expire(key, time)
         return bool(result)
 
+    async def incr(self, key: str, time: int = 0, initial: int = 0) -> int:
+        """
+        Incrementa um contador de forma atômica
+        Args:
+            key: Chave do Redis
+            time: Tempo de vida em segundos, contado a partir do 1º incremento
+                (0 = sem expiração)
+            initial: Valor de partida quando a chave ainda não existe
+        Returns:
+            Valor após o incremento
+        """
+        result = await self.incr_script(
+            keys=[key], args=[time, initial], client=self.node(key)
+        )
+        return int(result)
+
+    async def rate_limit(self, limits: Dict[str, int], window: int) -> float:
+        """
+        Conta uma requisição na janela deslizante de cada chave
+        A requisição só é contada se couber em todos os limites
+        Args:
+            limits: Mapa chave -> máximo de requisições na janela
+            window: Tamanho da janela em segundos
+        Returns:
+            0 se permitida ou segundos até caber nos limites
+        """
+        keys = list(limits)
+        result = await self.rate_limit_script(
+            keys=keys,
+            args=[window * 1000, *limits.values()],
+            client=self.node(keys[0]),
+        )
+        return int(result) / 1000
+
+    @asynccontextmanager
+    async def pipeline(
+        self, transaction: bool = False, key: Optional[str] = None
+    ) -> AsyncIterator[redis.client.Pipeline]:
+        """
+        Agrupa comandos num único round-trip
+        Os comandos pendentes são enviados ao sair do bloco; para ler os
+        resultados chame await pipe.execute() dentro dele
+        Args:
+            transaction: Envolve os comandos em MULTI/EXEC
+            key: Chave que escolhe o nó (modo sharded)
+        """
+        client = self.node(key) if key is not None else self.redis
+        async with client.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            if pipe.command_stack:
+                await pipe.execute()
+
+    async def insert_many(
+        self, values: Dict[str, str | int | Dict[str, Any]], time: int
+    ):
+        """
+        Insere várias chaves com o mesmo TTL em um round-trip
+        Args:
+            values: Mapa chave -> valor
+            time: Tempo de vida em segundos
+        """
+        keys = [str(key) for key in values]
+        items = list(values.values())
+
+        async def insert(client: redis.Redis, indexes: List[int]):
+            async with client.pipeline(transaction=False) as pipe:
+                for i in indexes:
+                    value = items[i]
+                    if isinstance(value, dict):
+                        value = orjson.dumps(value)
+                    pipe.setex(name=keys[i], time=time, value=value)
+                await pipe.execute()
+
+        await asyncio.gather(
+            *(insert(c, idx) for c, idx in self._group(keys).items())
+        )
+
+    async def search_many(
+        self, keys: Iterable[str], raw: bool = False
+    ) -> List[Optional[str]]:
+        """
+        Busca várias chaves com um MGET
+        Args:
+            keys: Chaves do Redis
+            raw: Retorna bytes sem decodificar (valores binários)
+        Returns:
+            Valores na ordem das chaves (None para as ausentes)
+        """
+        keys = list(keys)
+        options = {NEVER_DECODE: True} if raw else {}
+        groups = self._group(keys)
+        responses = await asyncio.gather(
+            *(
+                client.execute_command(
+                    'MGET', *(keys[i] for i in indexes), **options
+                )
+                for client, indexes in groups.items()
+            )
+        )
+
+        values: List[Optional[str]] = [None] * len(keys)
+        for indexes, response in zip(groups.values(), responses):
+            for i, value in zip(indexes, response):
+                values[i] = value
+        return values
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Remove várias chaves com um único DEL
+        Args:
+            keys: Chaves do Redis
+        Returns:
+            Quantidade de chaves removidas
+        """
+        keys = list(keys)
+        results = await asyncio.gather(
+            *(
+                client.delete(*(keys[i] for i in indexes))
+                for client, indexes in self._group(keys).items()
+            )
+        )
+        return sum(results)
+
+    async def expire_many(self, keys: Iterable[str], time: int) -> int:
+        """
+        Define o mesmo tempo de expiração para várias chaves
+        Args:
+            keys: Chaves do Redis
+            time: Tempo em segundos
+        Returns:
+            Quantidade de chaves que existiam
+        """
+        keys = list(keys)
+
+        async def expire(client: redis.Redis, indexes: List[int]) -> int:
+            async with client.pipeline(transaction=False) as pipe:
+                for i in indexes:
+                    pipe.expire(keys[i], time)
+                return sum(map(bool, await pipe.execute()))
+
+        results = await asyncio.gather(
+            *(expire(c, idx) for c, idx in self._group(keys).items())
+        )
+        return sum(results)
+
+    def pubsub(self) -> redis.client.PubSub:
+        """PubSub com conexão própria (ver get_pubsub_pool)"""
+        return redis.client.PubSub(get_pubsub_pool(self.redis.connection_pool))
+
     async def close(self):
-        """Fecha a conexão com o Redis"""
-        await self.redis.close()
+        """Fecha o cliente; as conexões do pool são fechadas em close_pools"""
+        for client in {self.redis, *self.nodes}:
+            await client.aclose()
+
+
+class SessionToucher:
+    """
+    Expiração deslizante das sessões com toques agrupados por worker
+
+    touch() só enfileira a sessão; a cada flush_interval os toques
+    pendentes vão num único pipeline (TOUCH_SESSION_SCRIPT), que estende
+    apenas se o TTL restante estiver abaixo de threshold. Com o TTL
+    devolvido a sessão não é tocada de novo até se aproximar do limite:
+    cerca de uma escrita por sessão a cada janela (ttl - threshold)
+    """
+
+    def __init__(
+        self,
+        manager: 'SessionManager',
+        ttl: int,
+        threshold: int,
+        flush_interval: float,
+        max_entries: int = 10000,
+    ):
+        self.manager = manager
+        self.ttl = ttl
+        self.threshold = threshold
+        self.flush_interval = flush_interval
+        # sessões que não precisam de toque até a entrada expirar
+        self._fresh = TTLCache(max_size=max_entries, ttl=ttl)
+        self._pending: dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, session_id: str, user_id) -> bool:
+        """
+        Marca a sessão para expiração deslizante
+        Args:
+            session_id: ID da sessão
+            user_id: ID do usuário dono da sessão
+        Returns:
+            True se a sessão foi enfileirada (pode ser estendida)
+        """
+        if session_id in self._fresh or session_id in self._pending:
+            return False
+        self._pending[session_id] = user_id
+        return True
+
+    def discard(self, session_id: str):
+        self._pending.pop(session_id, None)
+        self._fresh.pop(session_id)
+
+    async def flush(self):
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        manager = self.manager
+        now = manager._now()
+        session_ids = list(pending)
+
+        # um pipeline por nó (no modo sharded)
+        async def touch(client: redis.Redis, indexes: List[int]) -> list:
+            async with client.pipeline(transaction=False) as pipe:
+                for i in indexes:
+                    session_id = session_ids[i]
+                    user_id = pending[session_id]
+                    await manager.touch_session_script(
+                        keys=[
+                            manager.session_key(session_id),
+                            manager.user_session_key(user_id),
+                            manager.user_sessions_key(user_id),
+                        ],
+                        args=[
+                            session_id,
+                            self.ttl,
+                            self.threshold * 1000,
+                            now,
+                        ],
+                        client=pipe,
+                    )
+                return list(zip(indexes, await pipe.execute()))
+
+        groups = manager._group(
+            [manager.session_key(session_id) for session_id in session_ids]
+        )
+        results = [None] * len(session_ids)
+        for batch in await asyncio.gather(
+            *(touch(c, idx) for c, idx in groups.items())
+        ):
+            for i, pttl in batch:
+                results[i] = pttl
+
+        SESSION_TOUCHES.inc(len(results))
+        for session_id, pttl in zip(session_ids, results):
+            if pttl < 0:
+                continue
+            if pttl == self.ttl * 1000:
+                SESSION_EXTENDS.inc()
+            # próximo toque só quando o TTL voltar a ficar abaixo do limite
+            wait = pttl / 1000 - self.threshold
+            if wait > 0:
+                self._fresh.set(session_id, True, ttl=wait)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # sessões perdidas neste lote são tocadas na próxima requisição
+                logger.warning(f'Session touch flush failed: {e}')
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f'Session touch flush failed: {e}')
 
 
 class SessionManager(RedisManager):
+    """
+    Sessões no Redis com scripts Lua atômicos
+    Os scripts são registrados uma vez (SCRIPT LOAD) e chamados por SHA
+    (EVALSHA); em NOSCRIPT o redis-py recarrega o script automaticamente.
+    Todas as chaves tocadas vão em KEYS[] para o script continuar válido
+    em cluster
+
+    Com REDIS_SHARDS as sessões são distribuídas entre vários nós por
+    hashing consistente da hash tag {user_id}, presente no session_id e
+    nas chaves do usuário: as chaves de um usuário ficam no mesmo nó
+    """
+
     def __init__(self, config: Redis = config.redis):
-        super().__init__(config)
-
-        # Script Lua para criação atômica de sessão
-        self.create_session_script = """
-        local id = ARGV[1]
-        local session_id = ARGV[2]
-        local session_data = ARGV[3]
-        local ttl = tonumber(ARGV[4])
-        
-        -- Cria nova sessão
-        redis.call('SETEX', 'session:' .. session_id, ttl, session_data)
-        redis.call('SETEX', 'user_session:' .. id, ttl, session_id)
-        
-        return session_id
+        # o near-cache acompanha um único nó; desligado no modo sharded
+        if config.shards and config.near_cache:
+            logger.warning('Near-cache disabled: sessions are sharded')
+        super().__init__(config, near_cache=not config.shards)
+
+        self.ring: Optional[HashRing[redis.Redis]] = None
+        if config.shards:
+            self.ring = HashRing(
+                (node, self._shard_client(config, node))
+                for node in config.shards
+            )
+            logger.info(f'Sessions sharded across {config.shards}')
+
+        self.codec = SessionCodec(config.session_codec)
+        # 'string': blob codificado; 'hash': um campo por chave do payload
+        self.layout = config.session_layout
+
+        self.create_session_script = self.redis.register_script(
+            CREATE_SESSION_SCRIPT
+        )
+        self.previous_session_script = self.redis.register_script(
+            PREVIOUS_SESSION_SCRIPT
+        )
+        self.logout_session_script = self.redis.register_script(
+            LOGOUT_SESSION_SCRIPT
+        )
+        self.logout_script = self.redis.register_script(LOGOUT_USER_SCRIPT)
+        self.extend_session_script = self.redis.register_script(
+            EXTEND_SESSION_SCRIPT
+        )
+        self.update_fields_script = self.redis.register_script(
+            UPDATE_SESSION_FIELDS_SCRIPT
+        )
+        self.migrate_session_script = self.redis.register_script(
+            MIGRATE_SESSION_SCRIPT
+        )
+        self.touch_session_script = self.redis.register_script(
+            TOUCH_SESSION_SCRIPT
+        )
+
+        # expiração deslizante opcional; ativa só após toucher.start()
+        self.toucher: Optional[SessionToucher] = None
+        if config.sliding_sessions:
+            self.toucher = SessionToucher(
+                self,
+                ttl=config.ttl,
+                threshold=config.sliding_threshold,
+                flush_interval=config.sliding_flush_ms / 1000,
+            )
+
+    @staticmethod
+    def _shard_client(config: Redis, node: str) -> redis.Redis:
+        host, port, db = parse_node(node)
+        shard = config.model_copy(
+            update={'host': host, 'port': port, 'db': db}
+        )
+        return redis.Redis(connection_pool=get_pool(shard))
+
+    def node(self, key: str) -> redis.Redis:
+        if self.ring is None:
+            return self.redis
+        return self.ring.get(key)
+
+    @property
+    def nodes(self) -> List[redis.Redis]:
+        if self.ring is None:
+            return [self.redis]
+        return list(self.ring.nodes.values())
+
+    @property
+    def scripts(self):
+        return (
+            self.incr_script,
+            self.create_session_script,
+            self.previous_session_script,
+            self.logout_session_script,
+            self.logout_script,
+            self.extend_session_script,
+            self.update_fields_script,
+            self.migrate_session_script,
+            self.touch_session_script,
+        )
+
+    async def load_scripts(self):
+        """Pré-carrega os scripts no Redis (SCRIPT LOAD) na inicialização"""
+        for client in self.nodes:
+            for script in self.scripts:
+                await client.script_load(script.script)
+        logger.info(f'{len(self.scripts)} Lua scripts loaded')
+
+    async def start(self):
+        """Inicialização da aplicação: scripts, near-cache e toques"""
+        try:
+            await self.load_scripts()
+        except Exception as e:
+            # sem o preload os scripts são carregados no primeiro NOSCRIPT
+            logger.warning(f'Could not preload Lua scripts: {e}')
+
+        if self.near_cache:
+            self.near_cache.start()
+        if self.toucher:
+            self.toucher.start()
+
+    async def stop(self):
+        if self.toucher:
+            await self.toucher.stop()
+        if self.near_cache:
+            await self.near_cache.stop()
+        await self.close()
+
+    def touch(self, session_id: str, user_id) -> bool:
+        """
+        Expiração deslizante (quando habilitada): enfileira o toque
+        Returns:
+            True se a sessão pode ter sido estendida
         """
+        if self.toucher is None:
+            return False
+        return self.toucher.touch(session_id, user_id)
 
-        self.previous_session_script = """
-        local id = ARGV[1]
-        local session_id = ARGV[2]
-        local session_data = ARGV[3]
-        local ttl = tonumber(ARGV[4])
-        
-        -- Remove sessão anterior se existir
-        local old_session = redis.call('GET', 'user_session:' .. id)
-        if old_session then
-            redis.call('DEL', 'session:' .. old_session)
-            redis.call('DEL', 'user_session:' .. id)
-        end
-        
-        -- Cria nova sessão
-        redis.call('SETEX', 'session:' .. session_id, ttl, session_data)
-        redis.call('SETEX', 'user_session:' .. id, ttl, session_id)
-        
-        return session_id
+    def _user_tag(self, user_id) -> str:
+        return tag(user_id) if self.ring is not None else str(user_id)
+
+    def new_session_id(self, user_id) -> str:
+        """
+        Gera o session_id; no modo sharded leva a hash tag do usuário para
+        a sessão cair no mesmo nó das chaves do usuário
+        """
+        if self.ring is None:
+            return get_uuid()
+        return f'{tag(user_id)}{get_uuid()}'
+
+    @staticmethod
+    def session_key(session_id: str) -> str:
+        return f'session:{session_id}'
+
+    def user_session_key(self, user_id) -> str:
+        return f'user_session:{self._user_tag(user_id)}'
+
+    def user_sessions_key(self, user_id) -> str:
+        """Sorted set com as sessões do usuário (score: expiração em ms)"""
+        return f'user_sessions:{self._user_tag(user_id)}'
+
+    @staticmethod
+    def _now() -> int:
+        return int(time.time() * 1000)
+
+    @staticmethod
+    def _encode_fields(data: Dict[str, Any]) -> list:
+        """Pares campo/valor para HSET; valores em JSON preservam o tipo"""
+        fields = []
+        for key, value in data.items():
+            fields += [key, orjson.dumps(value)]
+        return fields
+
+    @staticmethod
+    def _decode_fields(fields: Dict[str, str]) -> Dict[str, Any]:
+        return {key: orjson.loads(value) for key, value in fields.items()}
+
+    def _payload(self, data: Dict[str, Any]) -> list:
+        if self.layout == 'hash':
+            return self._encode_fields(data)
+        return [self.codec.encode(data)]
+
+    async def _read_session(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Lê a sessão no layout configurado; sessões gravadas no outro layout
+        continuam legíveis (e são convertidas para hash quando for o caso)
         """
+        if self.layout == 'hash':
+            try:
+                fields = await self.node(key).hgetall(key)
+            except redis.ResponseError:
+                # WRONGTYPE: sessão criada antes da troca para hash
+                return await self._migrate_session(key)
+            return self._decode_fields(fields) if fields else None
 
-        # Script Lua para logout por session_id
-        self.logout_session_script = """
-        local session_id = ARGV[1]
-        
-        -- Busca dados da sessão
-        local session_data = redis.call('GET', 'session:' .. session_id)
-        
-        if session_data then
-            local data = cjson.decode(session_data)
-            local id = data.user_id
-            
-            if id then
-                -- Remove ambas as chaves
-                redis.call('DEL', 'session:' .. session_id)
-                redis.call('DEL', 'user_session:' .. id)
-                return 1
-            end
-        end
-        
-        return 0
-        """
-
-        # Script Lua para estender sessão
-        self.extend_session_script = """
-        local session_id = ARGV[1]
-        local ttl = tonumber(ARGV[2])
-        
-        -- Busca dados da sessão
-        local session_data = redis.call('GET', 'session:' .. session_id)
-        
-        if session_data then
-            local data = cjson.decode(session_data)
-            local id = data.user_id
-            
-            if id then
-                -- Estende ambas as chaves
-                redis.call('EXPIRE', 'session:' .. session_id, ttl)
-                redis.call('EXPIRE', 'user_session:' .. id, ttl)
-                return 1
-            end
-        end
-        
-        return 0
+        try:
+            value = await self.search(key, raw=True)
+        except redis.ResponseError:
+            # WRONGTYPE: sessão em hash após voltar para string
+            fields = await self.node(key).hgetall(key)
+            return self._decode_fields(fields) if fields else None
+        return self.codec.decode(value) if value is not None else None
+
+    async def _migrate_session(self, key: str) -> Optional[Dict[str, Any]]:
+        """Converte uma sessão blob em hash, preservando o TTL restante"""
+        value = await self.search(key, raw=True)
+        if value is None:
+            return None
+
+        data = self.codec.decode(value)
+        await self.migrate_session_script(
+            keys=[key],
+            args=[value, *self._encode_fields(data)],
+            client=self.node(key),
+        )
+        return data
+
+    async def migrate_sessions(self, batch: int = 500) -> int:
         """
+        Converte em lote as sessões ainda em blob para hash (SCAN, Redis 6+)
+        Args:
+            batch: Quantidade de chaves por iteração do SCAN
+        Returns:
+            Número de sessões convertidas
+        """
+        migrated = 0
+        for client in self.nodes:
+            async for key in client.scan_iter(
+                match=self.session_key('*'), count=batch, _type='string'
+            ):
+                if await self._migrate_session(key):
+                    migrated += 1
+        logger.info(f'{migrated} sessions migrated to hash')
+        return migrated
+
+    async def rebalance(self, batch: int = 500) -> int:
+        """
+        Move as chaves de sessão para o nó dono no anel atual (DUMP/RESTORE)
+        Executar após adicionar um nó em REDIS_SHARDS; enquanto as chaves de
+        um usuário são movidas as sessões dele podem não ser encontradas
+        Args:
+            batch: Quantidade de chaves por lote
+        Returns:
+            Número de chaves movidas
+        """
+        if self.ring is None:
+            return 0
+
+        moved = 0
+        for source in self.nodes:
+            for pattern in (
+                self.session_key('*'),
+                'user_session:*',
+                'user_sessions:*',
+            ):
+                keys = []
+                async for key in source.scan_iter(match=pattern, count=batch):
+                    if self.node(key) is not source:
+                        keys.append(key)
+                    if len(keys) >= batch:
+                        moved += await self._move(source, keys)
+                        keys = []
+                if keys:
+                    moved += await self._move(source, keys)
+
+        logger.info(f'{moved} session keys rebalanced')
+        return moved
+
+    async def _move(self, source: redis.Redis, keys: List[str]) -> int:
+        async with source.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.execute_command('DUMP', key, **{NEVER_DECODE: True})
+                pipe.pttl(key)
+            values = await pipe.execute()
+
+        moved = []
+        for i, key in enumerate(keys):
+            dump, pttl = values[2 * i], values[2 * i + 1]
+            if dump is None or pttl == -2:
+                continue  # expirou durante o SCAN
+            await self.node(key).restore(key, max(pttl, 0), dump, replace=True)
+            moved.append(key)
+
+        if moved:
+            await source.delete(*moved)
+        return len(moved)
 
     async def create(
         self,
@@ -173,13 +1008,21 @@ class SessionManager(RedisManager):
         """
 
         # Executa script Lua atômico
-        response = await self.redis.eval(
-            self.create_session_script,
-            0,  # sem chaves
-            data['id'],
-            session_id,
-            json.dumps(data),
-            str(ttl),
+        key = self.session_key(session_id)
+        response = await self.create_session_script(
+            keys=[
+                key,
+                self.user_session_key(data['id']),
+                self.user_sessions_key(data['id']),
+            ],
+            args=[
+                session_id,
+                ttl,
+                self.layout,
+                self._now(),
+                *self._payload(data),
+            ],
+            client=self.node(key),
         )
         logger.info(f'Session created: {session_id} {response}')
         return session_id
@@ -194,10 +1037,114 @@ class SessionManager(RedisManager):
         Returns:
             Dados do usuário ou None se não encontrado
         """
-        data = await self.search(f'session:{session_id}')
-        if data:
-            return json.loads(data)
-        return None
+        return await self.cached(
+            self.session_key(session_id), self._read_session
+        )
+
+    async def get_many_session_data(
+        self, session_ids: Iterable[str]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Recupera várias sessões em um round-trip (MGET ou pipeline de
+        HGETALL, conforme o layout)
+        Args:
+            session_ids: IDs das sessões
+        Returns:
+            Dados de cada sessão na ordem recebida (None se não existe)
+        """
+        keys = [self.session_key(session_id) for session_id in session_ids]
+        sessions: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        if self.layout != 'hash':
+            # MGET devolve nil também para sessões gravadas em hash
+            values = await self.search_many(keys, raw=True)
+            sessions = [
+                self.codec.decode(v) if v is not None else None for v in values
+            ]
+
+        missing = [i for i, data in enumerate(sessions) if data is None]
+        if not missing:
+            return sessions
+
+        async def hgetall(client: redis.Redis, indexes: List[int]) -> list:
+            async with client.pipeline(transaction=False) as pipe:
+                for i in indexes:
+                    pipe.hgetall(keys[i])
+                values = await pipe.execute(raise_on_error=False)
+            return list(zip(indexes, values))
+
+        groups = self._group([keys[i] for i in missing])
+        batches = await asyncio.gather(
+            *(
+                hgetall(client, [missing[j] for j in indexes])
+                for client, indexes in groups.items()
+            )
+        )
+
+        for i, value in (item for batch in batches for item in batch):
+            if isinstance(value, redis.ResponseError):
+                # WRONGTYPE: sessão string no layout hash (converte)
+                sessions[i] = await self._read_session(keys[i])
+            elif value:
+                sessions[i] = self._decode_fields(value)
+        return sessions
+
+    async def get_session_fields(
+        self, session_id: str, *fields: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Lê apenas alguns campos da sessão (HMGET no layout hash)
+        Args:
+            session_id: ID da sessão
+            *fields: Campos desejados
+        Returns:
+            Dicionário com os campos ou None se a sessão não existe
+        """
+        key = self.session_key(session_id)
+        if self.layout == 'hash' and not self.near_cache:
+            try:
+                values = await self.node(key).hmget(key, fields)
+            except redis.ResponseError:
+                values = None
+            else:
+                if all(v is None for v in values):
+                    return None
+                return {
+                    f: orjson.loads(v) if v is not None else None
+                    for f, v in zip(fields, values)
+                }
+
+        data = await self.get_session_data(session_id)
+        if data is None:
+            return None
+        return {f: data.get(f) for f in fields}
+
+    async def update_session_fields(self, session_id: str, **fields) -> bool:
+        """
+        Atualiza campos da sessão sem regravar o payload inteiro
+        (ex.: last_seen). No layout string regrava o blob mantendo o TTL
+        Args:
+            session_id: ID da sessão
+            **fields: Campos a atualizar
+        Returns:
+            True se atualizada, False se a sessão não existe
+        """
+        key = self.session_key(session_id)
+        if self.layout == 'hash':
+            result = await self.update_fields_script(
+                keys=[key],
+                args=self._encode_fields(fields),
+                client=self.node(key),
+            )
+            return bool(result)
+
+        data = await self._read_session(key)
+        if data is None:
+            return False
+        data.update(fields)
+        result = await self.node(key).set(
+            key, self.codec.encode(data), keepttl=True, xx=True
+        )
+        return bool(result)
 
     async def get_user_session_id(self, user_id: str) -> Optional[str]:
         """
@@ -207,7 +1154,7 @@ class SessionManager(RedisManager):
         Returns:
             session_id ativo ou None se não encontrado
         """
-        return await self.search(f'user_session:{user_id}')
+        return await self.search(self.user_session_key(user_id))
 
     async def validate_session(
         self, session_id: str
@@ -221,52 +1168,132 @@ class SessionManager(RedisManager):
         """
         return await self.get_session_data(session_id)
 
-    async def logout_user(self, user_id: str) -> bool:
+    async def list_sessions(self, user_id) -> List[Dict[str, Any]]:
+        """
+        Lista as sessões ativas do usuário pelo índice user_sessions
+        Args:
+            user_id: ID do usuário
+        Returns:
+            Lista de {'session_id', 'expires_at'} (epoch em segundos)
+        """
+        now = self._now()
+        index = self.user_sessions_key(user_id)
+        async with self.pipeline(key=index) as pipe:
+            # poda preguiçosa dos membros vencidos
+            pipe.zremrangebyscore(index, '-inf', now)
+            pipe.zrangebyscore(index, now, '+inf', withscores=True)
+            _, members = await pipe.execute()
+
+        return [
+            {'session_id': session_id, 'expires_at': score / 1000}
+            for session_id, score in members
+        ]
+
+    async def revoke_session(self, user_id, session_id: str) -> bool:
         """
-        Remove a sessão ativa do usuário de forma atômica usando Lua
+        Remove uma sessão do usuário, desde que pertença a ele
         Args:
             user_id: ID do usuário
+            session_id: ID da sessão
         Returns:
             True se a sessão foi removida, False se não existia
         """
-        result = await self.redis.eval(
-            self.logout_script,
-            0,  # sem chaves
-            user_id,
-        )
-        return bool(result)
+        index = self.user_sessions_key(user_id)
+        score = await self.node(index).zscore(index, session_id)
+        if score is None:
+            return False
+        return await self.logout_session(session_id, user_id=user_id)
+
+    async def logout_user(self, user_id) -> int:
+        """
+        Remove todas as sessões do usuário (logout global) usando o índice,
+        sem SCAN no keyspace
+        Args:
+            user_id: ID do usuário
+        Returns:
+            Quantidade de sessões removidas
+        """
+        index = self.user_sessions_key(user_id)
+        removed = 0
+        # as sessões são lidas antes para declarar suas chaves em KEYS[];
+        # se um login concorrente indexar outra sessão o script avisa e a
+        # leitura é repetida
+        while True:
+            session_ids = await self.node(index).zrange(index, 0, -1)
+            pointer = await self.get_user_session_id(user_id)
+            if pointer and pointer not in session_ids:
+                # sessão do modo UNIQUE anterior ao índice
+                session_ids.append(pointer)
+
+            count, remaining = await self.logout_script(
+                keys=[
+                    self.user_session_key(user_id),
+                    index,
+                    *map(self.session_key, session_ids),
+                ],
+                args=[self._now(), *session_ids],
+                client=self.node(index),
+            )
+            removed += count
+            if not remaining:
+                return removed
 
-    async def logout_session(self, session_id: str) -> bool:
+    async def logout_session(self, session_id: str, user_id=None) -> bool:
         """
         Remove uma sessão específica de forma atômica usando Lua
         Args:
             session_id: ID da sessão
+            user_id: ID do usuário dono da sessão (evita uma leitura extra)
         Returns:
             True se a sessão foi removida, False se não existia
         """
-        result = await self.redis.eval(
-            self.logout_session_script,
-            0,  # sem chaves
-            session_id,
+        if self.toucher:
+            self.toucher.discard(session_id)
+        if user_id is None:
+            data = await self.get_session_data(session_id)
+            if not data:
+                return False
+            user_id = data['id']
+
+        key = self.session_key(session_id)
+        result = await self.logout_session_script(
+            keys=[
+                key,
+                self.user_session_key(user_id),
+                self.user_sessions_key(user_id),
+            ],
+            args=[session_id],
+            client=self.node(key),
         )
         return bool(result)
 
     async def extend_session(
-        self, session_id: str, ttl_seconds: int = 3600
+        self, session_id: str, ttl_seconds: int = 3600, user_id=None
     ) -> bool:
         """
         Estende o tempo de vida de uma sessão de forma atômica usando Lua
         Args:
             session_id: ID da sessão
             ttl_seconds: Novo tempo de vida em segundos
+            user_id: ID do usuário dono da sessão (evita uma leitura extra)
         Returns:
             True se a sessão foi estendida, False se não existe
         """
-        result = await self.redis.eval(
-            self.extend_session_script,
-            0,  # sem chaves
-            session_id,
-            str(ttl_seconds),
+        if user_id is None:
+            data = await self.get_session_data(session_id)
+            if not data:
+                return False
+            user_id = data['id']
+
+        key = self.session_key(session_id)
+        result = await self.extend_session_script(
+            keys=[
+                key,
+                self.user_session_key(user_id),
+                self.user_sessions_key(user_id),
+            ],
+            args=[session_id, ttl_seconds, self._now()],
+            client=self.node(key),
         )
         return bool(result)
 
@@ -285,18 +1312,40 @@ class SessionManager(RedisManager):
         Returns:
             True se sessão anterior foi invalidada, False se não havia sessão anterior
         """
-        response = await self.redis.eval(
-            self.previous_session_script,
-            0,  # sem chaves
-            data['id'],
-            session_id,
-            json.dumps(data),
-            str(ttl),
-        )
+        # mesma estratégia do logout_user: lê o ponteiro, declara a chave da
+        # sessão antiga e repete se outro login trocou o ponteiro
+        key = self.session_key(session_id)
+        pointer = self.user_session_key(data['id'])
+        while True:
+            old_session = await self.get_user_session_id(data['id'])
+            # sem sessão anterior o script não toca KEYS[4]; repete o
+            # ponteiro para todas as chaves levarem a hash tag do usuário
+            old_key = self.session_key(old_session) if old_session else pointer
+
+            response = await self.previous_session_script(
+                client=self.node(key),
+                keys=[
+                    key,
+                    pointer,
+                    self.user_sessions_key(data['id']),
+                    old_key,
+                ],
+                args=[
+                    session_id,
+                    ttl,
+                    self.layout,
+                    old_session or '',
+                    self._now(),
+                    *self._payload(data),
+                ],
+            )
+            if response != -1:
+                break
+
         logger.info(f'Session created: {session_id} {response}')
-        return response
+        return bool(response)
 
 
 # Instância global do gerenciador Redis
+# (sessões: session_manager em connect/session.py)
 redis_manager = RedisManager(config=config.redis)
-session_manager = SessionManager()
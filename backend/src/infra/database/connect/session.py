@@ -0,0 +1,34 @@
+"""
+Seleção do armazenamento de sessões (APP_SESSION_STORE)
+    redis:  SessionManager, compartilhado entre workers/instâncias
+    memory: MemorySessionStore, somente para um único worker
+"""
+
+from config import Config, config, logger
+from src.core.ports.session import SessionStorePort
+
+
+def get_session_store(config: Config) -> SessionStorePort:
+    if config.app.session_store == 'memory':
+        from src.infra.database.connect.memory import MemorySessionStore
+
+        logger.warning('In-memory sessions: run a single worker')
+        return MemorySessionStore(
+            max_entries=config.app.session_max_entries,
+            sliding=config.redis.sliding_sessions,
+            sliding_ttl=config.redis.ttl,
+            sliding_threshold=config.redis.sliding_threshold,
+        )
+
+    if config.app.session_store != 'redis':
+        raise ValueError(
+            f'Session store desconhecido: {config.app.session_store}'
+        )
+
+    from src.infra.database.connect.redis import SessionManager
+
+    return SessionManager(config.redis)
+
+
+# singleton
+session_manager = get_session_store(config)
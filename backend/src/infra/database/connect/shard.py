@@ -0,0 +1,76 @@
+"""
+Sharding de chaves por hashing consistente
+
+A posição no anel é calculada sobre a hash tag da chave (o trecho entre
+chaves, como no Redis Cluster): session:{42}<uuid>, user_session:{42} e
+user_sessions:{42} caem no mesmo nó, então os scripts Lua que tocam as
+chaves de um usuário continuam atômicos
+"""
+
+import bisect
+import hashlib
+from typing import Generic, Iterable, List, TypeVar
+
+T = TypeVar('T')
+
+
+def hash_tag(key: str) -> str:
+    """Trecho usado no hash: conteúdo do primeiro {...} não vazio ou a chave"""
+    start = key.find('{')
+    if start != -1:
+        end = key.find('}', start + 1)
+        if end > start + 1:
+            return key[start + 1 : end]
+    return key
+
+
+def tag(value) -> str:
+    return f'{{{value}}}'
+
+
+def parse_node(node: str) -> tuple[str, str, int]:
+    """'host:port/db' -> (host, port, db); porta 6379 e db 0 por padrão"""
+    address, _, db = node.partition('/')
+    host, _, port = address.rpartition(':')
+    if not host:
+        host, port = port, ''
+    return host, port or '6379', int(db or 0)
+
+
+class HashRing(Generic[T]):
+    """
+    Anel de hashing consistente com nós virtuais
+    Ao adicionar um nó só ~1/N das chaves muda de dono
+    """
+
+    def __init__(self, nodes: Iterable[tuple[str, T]], replicas: int = 160):
+        self.replicas = replicas
+        self.nodes: dict[str, T] = {}
+        self._ring: List[int] = []
+        self._owners: List[str] = []
+        for name, node in nodes:
+            self.add(name, node)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+    def add(self, name: str, node: T):
+        self.nodes[name] = node
+        for i in range(self.replicas):
+            point = self._hash(f'{name}#{i}')
+            index = bisect.bisect(self._ring, point)
+            self._ring.insert(index, point)
+            self._owners.insert(index, name)
+
+    def owner(self, key: str) -> str:
+        """Nome do nó responsável pela chave"""
+        point = self._hash(hash_tag(key))
+        index = bisect.bisect(self._ring, point) % len(self._ring)
+        return self._owners[index]
+
+    def get(self, key: str) -> T:
+        return self.nodes[self.owner(key)]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import registry
+from src.infra.metrics import metrics
 
 URI = URL.create(
     drivername=config.postgres.drivername,
@@ -39,10 +40,19 @@ Session = async_sessionmaker(
 )
 
 
+metrics.gauge(
+    'db_pool_checked_out',
+    'Conexões do banco retiradas do pool',
+    lambda: engine.pool.checkedout(),
+)
+
+
 register = registry()
 
 
 # ---- Session helper (útil p/ FastAPI ou scripts) ------------
 async def get_session() -> AsyncIterator[AsyncSession]:
+    # a conexão só sai do pool no primeiro comando e volta no commit/rollback
+    # (ver release em src.utils.helpers.sql)
     async with Session() as session:
         yield session
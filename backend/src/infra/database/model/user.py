@@ -3,8 +3,10 @@ from datetime import datetime
 from sqlalchemy import (
     Boolean,
     DateTime,
+    Index,
     Integer,
     String,
+    func,
 )
 from sqlalchemy.orm import Mapped, mapped_column
 from src.infra.database.connect.sql import register
@@ -48,3 +50,8 @@ class UserModel:
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, init=False
     )
+
+
+# login sem diferenciar maiúsculas: WHERE lower(email) = :u usa o índice
+Index('ix_users_email_lower', func.lower(UserModel.email))
+Index('ix_users_username_lower', func.lower(UserModel.username))
@@ -0,0 +1,130 @@
+"""
+Verificação de entregabilidade do email (MX) fora do event loop bloqueante
+
+Mesmas regras do email_validator (MX, null MX, fallback para A/AAAA com
+IP público), mas com resolver assíncrono, timeout configurável e cache
+por domínio: gmail.com é resolvido uma vez por worker a cada TTL
+"""
+
+import asyncio
+import ipaddress
+from typing import Optional
+
+import dns.asyncresolver
+import dns.resolver
+from config import Email, config, logger
+from fastapi import HTTPException
+from src.infra.cache import TTLCache
+from src.infra.metrics import metrics
+
+EMAIL_DNS_LOOKUPS = metrics.counter(
+    'email_dns_lookups_total', 'Consultas DNS de entregabilidade do email'
+)
+
+
+class EmailDeliverability:
+    def __init__(self, config: Email):
+        self.enabled = config.check_deliverability
+        self.timeout = config.dns_timeout
+        self.ttl = config.cache_ttl
+        self.negative_ttl = config.cache_negative_ttl
+        self._cache = TTLCache(
+            config.cache_max_size, max(self.ttl, self.negative_ttl)
+        )
+        # consultas em andamento: cadastros simultâneos do mesmo domínio
+        # esperam a mesma resposta
+        self._pending: dict[str, asyncio.Future] = {}
+        self._resolver = None
+
+    @property
+    def resolver(self):
+        # criado sob demanda: lê o /etc/resolv.conf
+        if self._resolver is None:
+            self._resolver = dns.asyncresolver.Resolver()
+            self._resolver.lifetime = self.timeout
+        return self._resolver
+
+    async def _has_global_address(self, domain: str) -> bool:
+        for rdtype in ('A', 'AAAA'):
+            try:
+                response = await self.resolver.resolve(domain, rdtype)
+            except dns.resolver.NoAnswer:
+                continue
+            for record in response:
+                try:
+                    if ipaddress.ip_address(record.address).is_global:
+                        return True
+                except ValueError:
+                    pass
+        return False
+
+    async def _resolve(self, domain: str) -> Optional[str]:
+        """
+        Consulta o DNS do domínio
+        Returns:
+            None se aceita email ou o motivo da recusa
+        Raises:
+            dns.exception.DNSException: Sem resposta conclusiva (timeout)
+        """
+        EMAIL_DNS_LOOKUPS.inc()
+        try:
+            response = await self.resolver.resolve(domain, 'MX')
+            # RFC 7505: null MX (0 ".") indica que o domínio não recebe email
+            if not any(str(r.exchange).rstrip('.') for r in response):
+                return f'The domain name {domain} does not accept email.'
+            return None
+        except dns.resolver.NXDOMAIN:
+            return f'The domain name {domain} does not exist.'
+        except dns.resolver.NoAnswer:
+            pass
+
+        if await self._has_global_address(domain):
+            return None
+        return f'The domain name {domain} does not accept email.'
+
+    async def undeliverable(self, domain: str) -> Optional[str]:
+        """
+        Motivo da recusa do domínio (None se aceita email ou se o DNS
+        não respondeu a tempo)
+        Args:
+            domain: Domínio do email
+        """
+        domain = domain.lower()
+        cached = self._cache.get(domain)
+        if cached is not None:
+            return cached or None
+
+        pending = self._pending.get(domain)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[domain] = future
+        reason = None
+        try:
+            reason = await self._resolve(domain)
+            # '' marca o positivo no cache (None é ausência)
+            self._cache.set(
+                domain,
+                reason or '',
+                self.negative_ttl if reason else self.ttl,
+            )
+        except Exception as e:
+            # DNS lento ou fora: não bloqueia o cadastro nem guarda no cache
+            logger.warning(f'Email deliverability unknown for {domain}: {e}')
+        finally:
+            del self._pending[domain]
+            future.set_result(reason)
+        return reason
+
+    async def check(self, email: str):
+        """Recusa o cadastro (400) se o domínio do email não recebe email"""
+        if not self.enabled:
+            return
+        reason = await self.undeliverable(email.rpartition('@')[2])
+        if reason:
+            raise HTTPException(status_code=400, detail=reason)
+
+
+# singleton
+email_deliverability = EmailDeliverability(config.email)
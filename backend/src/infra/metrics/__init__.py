@@ -0,0 +1,145 @@
+"""
+Métricas em memória no formato texto do Prometheus
+Cada worker expõe as próprias séries em /metrics (ver otel/config/prometheus.yml)
+"""
+
+import math
+from threading import Lock
+from typing import Callable, Dict, Iterable, Tuple
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    body = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return '{%s}' % body
+
+
+class Counter:
+    """Contador monotônico com labels opcionais"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[Tuple, float] = {}
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f'{self.name}{_labels(dict(key))} {value}'
+
+
+class Gauge:
+    """Gauge calculado no momento da coleta"""
+
+    kind = 'gauge'
+
+    def __init__(
+        self, name: str, description: str, collect: Callable[[], float]
+    ):
+        self.name = name
+        self.description = description
+        self.collect = collect
+
+    def samples(self) -> Iterable[str]:
+        yield f'{self.name} {self.collect()}'
+
+
+class Histogram:
+    """Histograma cumulativo (segundos por padrão)"""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+
+    def samples(self) -> Iterable[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets, self._counts):
+            cumulative += count
+            le = '+Inf' if bound == math.inf else repr(bound)
+            yield f'{self.name}_bucket{{le="{le}"}} {cumulative}'
+        yield f'{self.name}_sum {self._sum}'
+        yield f'{self.name}_count {self._count}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Counter | Gauge | Histogram] = {}
+
+    def _register(self, metric):
+        # idempotente: reimportar o módulo não duplica a série
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(
+        self, name: str, description: str, collect: Callable[[], float]
+    ) -> Gauge:
+        return self._register(Gauge(name, description, collect))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, description, buckets))
+
+    def render(self) -> str:
+        """Serializa todas as métricas no formato de exposição do Prometheus"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.description}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+# singleton
+metrics = MetricsRegistry()
@@ -1,19 +1,20 @@
+import hashlib
+import time
 from dataclasses import dataclass
+from typing import Optional
 
 import jwt
-from config import config
-from fastapi import Depends, HTTPException
+from config import JWT, config
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer
-from sqlalchemy.ext.asyncio import AsyncSession
 from src.adapter.repository.user import UserRepository
-from src.infra.database.connect.redis import session_manager
-from src.infra.database.connect.sql import get_session
-
-
-@dataclass
-class AuthResponse:
-    user: dict
-    payload: dict
+from src.infra.cache import TTLCache
+from src.infra.cache.user import user_cache
+from src.infra.database.connect.session import session_manager
+from src.infra.database.connect.sql import Session
+from src.infra.security.auth.keys import KeyRing
+from src.infra.security.auth.revocation import token_revocation
+from src.infra.security.auth.session import SessionData
 
 
 @dataclass
@@ -21,42 +22,89 @@ class Authorization:
     access_token: str
     token_type: str = 'Bearer'
     expires_at: float = 0
+    refresh_token: Optional[str] = None
 
 
 class JWTManager:
-    def __init__(self):
-        pass
+    def __init__(self, config: JWT = config.jwt):
+        self.config = config
+        # token já verificado não passa de novo pela assinatura até o exp
+        self.cache = (
+            TTLCache(max_size=config.cache_max_size, ttl=config.cache_ttl)
+            if config.cache_max_size
+            else None
+        )
+
+        # HS*: segredo compartilhado; EdDSA/ES256: chaves com kid (JWKS)
+        self.keyring: KeyRing = None
+        if not config.algorithm.startswith('HS'):
+            self.keyring = KeyRing.from_files(
+                config.private_keys, config.public_keys
+            )
 
     def create(self, data: dict) -> Authorization:
-        token = jwt.encode(
-            data, config.jwt.secret, algorithm=config.jwt.algorithm
-        )
+        if self.keyring is None:
+            token = jwt.encode(
+                data, self.config.secret, algorithm=self.config.algorithm
+            )
+        else:
+            key = self.keyring.signing
+            token = jwt.encode(
+                data,
+                key.private_key,
+                algorithm=key.algorithm,
+                headers={'kid': key.kid},
+            )
         return Authorization(access_token=token, expires_at=data['exp'])
 
-    def validate(self, token: str) -> dict:
-        data = jwt.decode(
-            token, config.jwt.secret, algorithms=[config.jwt.algorithm]
+    def _decode(self, token: str, **kwargs) -> dict:
+        if self.keyring is None:
+            return jwt.decode(
+                token,
+                self.config.secret,
+                algorithms=[self.config.algorithm],
+                **kwargs,
+            )
+
+        key = self.keyring.get(jwt.get_unverified_header(token).get('kid'))
+        if key is None:
+            raise jwt.exceptions.InvalidTokenError('Unknown kid')
+        return jwt.decode(
+            token, key.public_key, algorithms=[key.algorithm], **kwargs
         )
+
+    def validate(self, token: str) -> dict:
+        if self.cache is None:
+            return self._decode(token)
+
+        key = hashlib.sha256(token.encode()).digest()
+        data = self.cache.get(key)
+        if data is not None:
+            if 'exp' not in data or data['exp'] > time.time():
+                return dict(data)
+            self.cache.pop(key)
+
+        data = self._decode(token)
+        ttl = data['exp'] - time.time() if 'exp' in data else None
+        if ttl is None or ttl > 0:
+            self.cache.set(key, dict(data), ttl=ttl)
         return data
 
     def decode_ignore_exp(self, token: str) -> dict:
-        data = jwt.decode(
-            token,
-            config.jwt.secret,
-            algorithms=[config.jwt.algorithm],
-            options={'verify_exp': False},
-        )
-        return data
+        return self._decode(token, options={'verify_exp': False})
 
 
 jwt_manager = JWTManager()
 
 
 async def get_current_user_jwt(
+    request: Request,
     bearer: str = Depends(HTTPBearer()),
-    session: AsyncSession = Depends(get_session),
-) -> AuthResponse:
-    repository = UserRepository(session)
+) -> SessionData:
+    # mesma requisição (dependência do router e do endpoint): uma validação
+    auth = getattr(request.state, 'auth', None)
+    if auth is not None:
+        return auth
 
     if not bearer or not bearer.credentials:
         raise HTTPException(status_code=401, detail='Unauthorized')
@@ -66,31 +114,50 @@ async def get_current_user_jwt(
     try:
         payload = jwt_manager.validate(token)
 
-        if config.app.login_mode == 'UNIQUE':
+        # Redis só é consultado se o Bloom filter acusar o jti
+        if 'jti' in payload and await token_revocation.is_revoked(
+            payload['jti']
+        ):
+            raise HTTPException(status_code=401, detail='Token revoked')
+
+        # com refresh tokens o access é validado só pela assinatura; a
+        # revogação vale no próximo refresh (até access_expiration_time)
+        if config.app.login_mode == 'UNIQUE' and not config.jwt.refresh_tokens:
             is_already = await session_manager.get_session_data(
                 session_id=payload['session_id']
             )
             if not is_already:
                 raise HTTPException(status_code=401, detail='Unauthorized')
 
+            session_manager.touch(payload['session_id'], payload['id'])
+
     except jwt.exceptions.ExpiredSignatureError:
+        if config.jwt.refresh_tokens:
+            # access curto expira o tempo todo: o cliente usa o refresh
+            raise HTTPException(status_code=401, detail='Token expired')
+
         payload = jwt_manager.decode_ignore_exp(token)
-        user = await repository.get(payload['id'])
-        user.allowed, user.logged_in = False, False
-        await repository.session.commit()
-        await repository.session.refresh(user)
+        async with Session() as session:
+            await UserRepository(session).update(
+                payload['id'], {'allowed': False, 'logged_in': False}
+            )
         if config.app.login_mode == 'UNIQUE':
-            await session_manager.delete_session(
-                session_id=payload['session_id']
+            await session_manager.logout_session(
+                session_id=payload['session_id'], user_id=payload['id']
             )
         raise HTTPException(status_code=401, detail='Token expired')
     except jwt.exceptions.InvalidTokenError:
         raise HTTPException(status_code=401, detail='Invalid token')
+    except HTTPException:
+        # revogado/sessão encerrada: repassa sem embrulhar de novo
+        raise
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
 
-    user = await repository.get(payload['id'])
-    return AuthResponse(user=user, payload=payload)
+    # banco só é consultado quando o usuário não está no cache do worker
+    user = await user_cache.get(payload['id'])
+    request.state.auth = SessionData(user=user, payload=payload)
+    return request.state.auth
 
 
 if __name__ == '__main__':
@@ -0,0 +1,149 @@
+"""
+Chaves assimétricas do JWT (EdDSA / ES256) com rotação
+
+A primeira chave privada configurada assina; as demais (e as públicas
+aposentadas) continuam publicadas no JWKS e aceitas na verificação até
+saírem da configuração. O kid é derivado da chave pública, então o mesmo
+arquivo gera sempre o mesmo kid em todos os workers
+"""
+
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+def _crypto():
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+    except ImportError as e:
+        raise RuntimeError(
+            'JWT assimétrico requer pyjwt[crypto] (cryptography) instalado'
+        ) from e
+    return serialization, ec, ed25519
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    public_key: Any
+    private_key: Any = None
+
+    def jwk(self) -> Dict[str, Any]:
+        from jwt.algorithms import get_default_algorithms
+
+        jwk = get_default_algorithms()[self.algorithm].to_jwk(
+            self.public_key, as_dict=True
+        )
+        jwk.update(kid=self.kid, alg=self.algorithm, use='sig')
+        return jwk
+
+
+def _algorithm(public_key) -> str:
+    _, ec, ed25519 = _crypto()
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return 'EdDSA'
+    if isinstance(public_key, ec.EllipticCurvePublicKey) and isinstance(
+        public_key.curve, ec.SECP256R1
+    ):
+        return 'ES256'
+    raise ValueError(f'Tipo de chave não suportado: {type(public_key)}')
+
+
+def _kid(public_key) -> str:
+    serialization, _, _ = _crypto()
+    der = public_key.public_bytes(
+        serialization.Encoding.DER,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    digest = hashlib.sha256(der).digest()[:12]
+    return base64.urlsafe_b64encode(digest).decode().rstrip('=')
+
+
+def load_key(path: str, private: bool = True) -> SigningKey:
+    """
+    Carrega uma chave PEM
+    Args:
+        path: Caminho do arquivo PEM
+        private: True para chave privada (assinatura), False só verificação
+    """
+    serialization, _, _ = _crypto()
+    data = Path(path).read_bytes()
+    if private:
+        private_key = serialization.load_pem_private_key(data, password=None)
+        public_key = private_key.public_key()
+    else:
+        private_key = None
+        public_key = serialization.load_pem_public_key(data)
+    return SigningKey(
+        kid=_kid(public_key),
+        algorithm=_algorithm(public_key),
+        public_key=public_key,
+        private_key=private_key,
+    )
+
+
+class KeyRing:
+    """Chaves ativas: uma de assinatura e N de verificação (rotação)"""
+
+    def __init__(self, keys: Iterable[SigningKey]):
+        self.keys: Dict[str, SigningKey] = {}
+        for key in keys:
+            self.keys.setdefault(key.kid, key)
+        signing = [k for k in self.keys.values() if k.private_key]
+        if not signing:
+            raise ValueError('Nenhuma chave privada para assinar o JWT')
+        self.signing = signing[0]
+        self._jwks = None
+
+    @classmethod
+    def from_files(cls, private: Iterable[str], public: Iterable[str] = ()):
+        return cls(
+            [load_key(p) for p in private]
+            + [load_key(p, private=False) for p in public]
+        )
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        return self.keys.get(kid)
+
+    def jwks(self) -> Dict[str, Any]:
+        if self._jwks is None:
+            self._jwks = {'keys': [k.jwk() for k in self.keys.values()]}
+        return self._jwks
+
+    def etag(self) -> str:
+        body = json.dumps(self.jwks(), sort_keys=True).encode()
+        return '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def generate_key(path: str, algorithm: str = 'EdDSA'):
+    """Gera uma chave privada PEM nova (EdDSA ou ES256)"""
+    serialization, ec, ed25519 = _crypto()
+    if algorithm == 'EdDSA':
+        key = ed25519.Ed25519PrivateKey.generate()
+    elif algorithm == 'ES256':
+        key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        raise ValueError(f'Algoritmo não suportado: {algorithm}')
+
+    Path(path).write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    Path(path).chmod(0o600)
+    return load_key(path)
+
+
+if __name__ == '__main__':
+    # uso: python -m src.infra.security.auth.keys <arquivo.pem> [EdDSA|ES256]
+    import sys
+
+    key = generate_key(sys.argv[1], *sys.argv[2:3])
+    print(f'{key.algorithm} key {key.kid} written to {sys.argv[1]}')
@@ -0,0 +1,122 @@
+"""
+Refresh tokens rotativos com detecção de reuso
+
+O token é '<família>.<segredo>'; no Redis fica só o hash do token atual
+da família (refresh_family:<família>). Cada uso troca o token; apresentar
+um token já trocado indica vazamento e revoga a família e a sessão
+"""
+
+import hashlib
+import secrets
+from dataclasses import dataclass
+from typing import Optional
+
+from config import JWT, config, logger
+from fastapi import HTTPException
+from src.infra.database.connect.lua import ROTATE_REFRESH_SCRIPT
+from src.infra.database.connect.redis import RedisManager, redis_manager
+from src.infra.database.connect.session import session_manager
+from src.infra.metrics import metrics
+
+REFRESH_REUSE = metrics.counter(
+    'jwt_refresh_reuse_total', 'Refresh tokens reapresentados (revogados)'
+)
+
+
+@dataclass
+class RefreshGrant:
+    user_id: int
+    session_id: Optional[str]
+    refresh_token: str
+
+
+class RefreshTokenManager:
+    def __init__(self, redis: RedisManager, config: JWT = config.jwt):
+        self.redis = redis
+        self.ttl = config.refresh_expiration_time
+        self.rotate_script = redis.redis.register_script(ROTATE_REFRESH_SCRIPT)
+
+    @staticmethod
+    def family_key(family: str) -> str:
+        return f'refresh_family:{family}'
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def _new_token(family: str) -> str:
+        return f'{family}.{secrets.token_urlsafe(32)}'
+
+    async def issue(self, user_id: int, session_id: str = None) -> str:
+        """
+        Abre uma família nova (login)
+        Args:
+            user_id: ID do usuário
+            session_id: Sessão do modo UNIQUE; o refresh morre junto com ela
+        Returns:
+            Refresh token
+        """
+        family = secrets.token_urlsafe(16)
+        token = self._new_token(family)
+        key = self.family_key(family)
+        async with self.redis.pipeline(transaction=True, key=key) as pipe:
+            pipe.hset(
+                key,
+                mapping={
+                    'current': self._digest(token),
+                    'user_id': user_id,
+                    'session_id': session_id or '',
+                },
+            )
+            pipe.expire(key, self.ttl)
+        return token
+
+    async def rotate(self, token: str) -> RefreshGrant:
+        """
+        Troca o refresh token por um novo
+        Args:
+            token: Refresh token apresentado
+        Returns:
+            RefreshGrant com o dono e o novo token
+        """
+        family, _, secret = token.partition('.')
+        if not family or not secret:
+            raise HTTPException(status_code=401, detail='Invalid token')
+
+        key = self.family_key(family)
+        new_token = self._new_token(family)
+        result = await self.rotate_script(
+            keys=[key],
+            args=[self._digest(token), self._digest(new_token), self.ttl],
+            client=self.redis.node(key),
+        )
+        if not result:
+            raise HTTPException(status_code=401, detail='Invalid token')
+
+        status, user_id, session_id = result
+        user_id, session_id = int(user_id), session_id or None
+        if status == -1:
+            REFRESH_REUSE.inc()
+            logger.warning(f'Refresh token reuse for user {user_id}')
+            if session_id:
+                await session_manager.logout_session(
+                    session_id, user_id=user_id
+                )
+            raise HTTPException(status_code=401, detail='Token revoked')
+
+        # UNIQUE: novo login (ou logout) encerrou a sessão da família
+        if session_id and not await session_manager.extend_session(
+            session_id, config.redis.ttl, user_id=user_id
+        ):
+            await self.revoke(family)
+            raise HTTPException(status_code=401, detail='Unauthorized')
+
+        return RefreshGrant(user_id, session_id, new_token)
+
+    async def revoke(self, family: str) -> bool:
+        return await self.redis.delete(self.family_key(family))
+
+
+# singleton
+refresh_manager = RefreshTokenManager(redis_manager)
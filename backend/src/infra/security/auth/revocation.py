@@ -0,0 +1,125 @@
+"""
+Revogação de JWT por jti (útil no modo MULTIPLE, sem session_id)
+
+Cada jti revogado fica no Redis (revoked_jti:<jti>) até o exp do token.
+Cada worker espelha a lista num Bloom filter alimentado por pub/sub, e o
+Redis só é consultado quando o filtro acusa um possível revogado
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from config import JWT, config, logger
+from src.infra.database.connect.redis import RedisManager, redis_manager
+from src.infra.metrics import metrics
+from src.utils.helpers.bloom import BloomFilter
+
+REVOCATION_CHECKS = metrics.counter(
+    'jwt_revocation_redis_checks_total',
+    'Tokens confirmados no Redis (positivo do filtro ou filtro fora de sync)',
+)
+
+
+class TokenRevocation:
+    CHANNEL = 'jwt:revoked'
+
+    def __init__(self, redis: RedisManager, config: JWT = config.jwt):
+        self.redis = redis
+        self.capacity = config.revocation_capacity
+        self.error_rate = config.revocation_error_rate
+        self.rebuild_interval = config.revocation_rebuild_interval
+        self.filter = BloomFilter(self.capacity, self.error_rate)
+        # filtro só é confiável enquanto o listener está inscrito
+        self.synced = False
+        self._listener: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def key(jti: str) -> str:
+        return f'revoked_jti:{jti}'
+
+    async def revoke(self, jti: str, exp: float) -> bool:
+        """
+        Revoga o token até o seu exp
+        Args:
+            jti: ID do token
+            exp: Expiração do token (epoch)
+        Returns:
+            False se o token já expirou (nada a revogar)
+        """
+        ttl = int(exp - time.time()) + 1
+        if ttl <= 0:
+            return False
+
+        await self.redis.insert(self.key(jti), 1, ttl)
+        self.filter.add(jti)
+        try:
+            await self.redis.redis.publish(self.CHANNEL, jti)
+        except Exception as e:
+            # os demais workers recebem no próximo rebuild
+            logger.warning(f'Token revocation not published: {e}')
+        return True
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self.synced and jti not in self.filter:
+            return False
+        REVOCATION_CHECKS.inc()
+        return bool(await self.redis.redis.exists(self.key(jti)))
+
+    async def _rebuild(self):
+        """Recria o filtro a partir do Redis (descarta jtis já expirados)"""
+        jtis = []
+        async for key in self.redis.redis.scan_iter(
+            match=self.key('*'), count=1000
+        ):
+            jtis.append(key.split(':', 1)[1])
+
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        bloom.update(jtis)
+        self.filter = bloom
+        logger.info(f'Token revocation filter rebuilt: {len(jtis)} jtis')
+
+    async def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                # inscreve antes do SCAN: o que chegar durante ele fica na fila
+                await pubsub.subscribe(self.CHANNEL)
+                await self._rebuild()
+                self.synced = True
+                rebuilt_at = time.monotonic()
+
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1
+                    )
+                    if message and message['type'] == 'message':
+                        self.filter.add(message['data'])
+                    if time.monotonic() - rebuilt_at > self.rebuild_interval:
+                        await self._rebuild()
+                        rebuilt_at = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f'Token revocation listener error: {e}')
+                await asyncio.sleep(1)
+            finally:
+                self.synced = False
+                await pubsub.aclose()
+
+    def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+# singleton
+token_revocation = TokenRevocation(redis_manager)
@@ -1,22 +1,29 @@
 from dataclasses import dataclass
 
-from fastapi import Depends, HTTPException, Request
-from sqlalchemy.ext.asyncio import AsyncSession
-from src.adapter.repository.user import UserModel, UserRepository
-from src.infra.database.connect.redis import session_manager
-from src.infra.database.connect.sql import get_session
+from config import config
+from fastapi import HTTPException, Request, Response
+from src.core.domain.user import AuthPrincipal
+from src.infra.cache.user import user_cache
+from src.infra.database.connect.session import session_manager
 
 
 @dataclass
 class SessionData:
-    user: UserModel
+    """Resultado das dependências de auth (cookie e JWT)"""
+
+    user: AuthPrincipal
+    # dados da sessão no Redis (cookie) ou claims do token (JWT)
     payload: dict
 
 
 async def get_current_user_cookie(
-    request: Request,
-    session: AsyncSession = Depends(get_session),
-):
+    request: Request, response: Response
+) -> SessionData:
+    # mesma requisição (dependência do router e do endpoint): uma validação
+    auth = getattr(request.state, 'auth', None)
+    if auth is not None:
+        return auth
+
     token = request.cookies.get('session')
 
     if not token:
@@ -24,8 +31,6 @@ async def get_current_user_cookie(
             status_code=401, detail='Could not validate credentials'
         )
 
-    repository = UserRepository(session)
-
     data = await session_manager.get_session_data(token)
 
     if not data:
@@ -33,6 +38,19 @@ async def get_current_user_cookie(
             status_code=401, detail='Could not validate credentials'
         )
 
-    user = await repository.get(_id=data['uid'])
+    # expiração deslizante: o cookie acompanha a sessão estendida
+    if session_manager.touch(token, data['id']):
+        response.set_cookie(
+            key='session',
+            value=token,
+            max_age=config.redis.ttl,
+            httponly=True,
+            secure=True,
+            samesite='Strict',
+        )
+
+    # banco só é consultado quando o usuário não está no cache do worker
+    user = await user_cache.get(data['id'])
 
-    return user, data
+    request.state.auth = SessionData(user=user, payload=data)
+    return request.state.auth
@@ -1,21 +1,236 @@
+import asyncio
+import os
+import time
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
 from bcrypt import checkpw, gensalt, hashpw
+from config import HashPass, config, logger
+from fastapi import HTTPException
+from src.infra.metrics import metrics
+
+HASH_QUEUE_WAIT = metrics.histogram(
+    'hashpass_queue_wait_seconds',
+    'Tempo que o hash aguardou um worker livre',
+)
+HASH_DURATION = metrics.histogram(
+    'hashpass_duration_seconds',
+    'Tempo de CPU gasto no hash/verificação',
+)
+HASH_REJECTED = metrics.counter(
+    'hashpass_rejected_total',
+    'Hashes recusados por fila cheia (HTTP 503)',
+)
+
+
+class BcryptEngine:
+    name = 'bcrypt'
+    prefixes = ('$2a$', '$2b$', '$2y$')
+
+    def __init__(self, config: HashPass):
+        self.rounds = config.bcrypt_rounds
+
+    def hash(self, password: str) -> str:
+        salt = gensalt(rounds=self.rounds)
+        return hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return checkpw(
+            password.encode('utf-8'), hashed_password.encode('utf-8')
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        # formato: $2b$<custo>$<salt+hash>
+        return int(hashed_password.split('$')[2]) != self.rounds
+
+
+class Argon2Engine:
+    name = 'argon2id'
+    prefixes = ('$argon2id$',)
+
+    def __init__(self, config: HashPass):
+        try:
+            from argon2 import PasswordHasher
+        except ImportError as e:
+            raise RuntimeError(
+                'argon2id requer o pacote argon2-cffi instalado'
+            ) from e
+
+        self.hasher = PasswordHasher(
+            time_cost=config.argon2_time_cost,
+            memory_cost=config.argon2_memory_cost,
+            parallelism=config.argon2_parallelism,
+        )
+
+    def hash(self, password: str) -> str:
+        return self.hasher.hash(password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        from argon2.exceptions import InvalidHashError, VerificationError
+
+        try:
+            return self.hasher.verify(hashed_password, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self.hasher.check_needs_rehash(hashed_password)
+
+
+ENGINES = {
+    BcryptEngine.name: BcryptEngine,
+    Argon2Engine.name: Argon2Engine,
+}
+
+
+def _timed(func, submitted_at: float, *args):
+    """
+    Executa no worker e devolve (espera na fila, duração, resultado)
+    time.monotonic é comparável entre processos no mesmo host
+    """
+    started = time.monotonic()
+    result = func(*args)
+    return started - submitted_at, time.monotonic() - started, result
+
+
+class HashPassPool:
+    """
+    Pool limitado para tirar o bcrypt do event loop
+    in-flight = executando + aguardando; acima de workers + max_queue
+    responde 503 em vez de acumular requisições
+    """
+
+    def __init__(self, config: HashPass):
+        self.kind = config.executor
+        self.workers = config.workers or os.cpu_count() or 1
+        self.capacity = self.workers + config.max_queue
+        self.retry_after = config.retry_after
+        self._executor: Executor | None = None
+        self._in_flight = 0
+
+        metrics.gauge(
+            'hashpass_in_flight',
+            'Hashes executando ou aguardando no pool',
+            lambda: self._in_flight,
+        )
+
+    @property
+    def executor(self) -> Executor:
+        # criado sob demanda para não subir processos na importação
+        if self._executor is None:
+            if self.kind == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                # bcrypt libera o GIL, threads já escalam com os núcleos
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='hashpass'
+                )
+            logger.info(f'HashPassPool {self.kind} x{self.workers}')
+        return self._executor
+
+    async def run(self, func, *args):
+        if self._in_flight >= self.capacity:
+            HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=503,
+                detail='Server busy, try again later',
+                headers={'Retry-After': str(self.retry_after)},
+            )
+
+        self._in_flight += 1
+        try:
+            job = self.executor.submit(_timed, func, time.monotonic(), *args)
+        except BaseException:
+            self._in_flight -= 1
+            raise
+
+        # a vaga é liberada quando o worker termina, não quando o await
+        # acaba: cancelar a requisição não interrompe o hash em andamento
+        loop = asyncio.get_running_loop()
+        job.add_done_callback(lambda _: self._release(loop))
+        wait, elapsed, result = await asyncio.wrap_future(job)
+
+        HASH_QUEUE_WAIT.observe(wait)
+        HASH_DURATION.observe(elapsed)
+        return result
+
+    def _release(self, loop: asyncio.AbstractEventLoop):
+        # chamado na thread do worker (ou do executor de processos)
+        try:
+            loop.call_soon_threadsafe(self._done)
+        except RuntimeError:
+            # loop já encerrado (shutdown): não há mais quem contar
+            pass
+
+    def _done(self):
+        self._in_flight -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
 
 class HashPassManager:
-    @staticmethod
-    def hash(password: str) -> str:
+    """
+    Hash de senhas com engine plugável (bcrypt ou argon2id)
+    Novos hashes usam config.hashpass.algorithm; hashes existentes são
+    verificados pela engine que os gerou (identificada pelo prefixo)
+    """
+
+    def __init__(self, pool: HashPassPool, config: HashPass):
+        self.pool = pool
+        self.config = config
+        self._engines = {}
+        self.engine = self._get_engine(config.algorithm)
+
+    def _get_engine(self, name: str):
+        if name not in self._engines:
+            if name not in ENGINES:
+                raise ValueError(f'Algoritmo de hash desconhecido: {name}')
+            self._engines[name] = ENGINES[name](self.config)
+        return self._engines[name]
+
+    def engine_for(self, hashed_password: str):
+        """Engine que gerou o hash informado"""
+        for name, engine_cls in ENGINES.items():
+            if hashed_password.startswith(engine_cls.prefixes):
+                return self._get_engine(name)
+        raise ValueError('Formato de hash de senha desconhecido')
+
+    def hash(self, password: str) -> str:
         """Gera um hash de senha."""
-        return hashpw(password.encode('utf-8'), gensalt()).decode('utf-8')
+        return self.engine.hash(password)
 
-    @staticmethod
-    def verify(password: str, hashed_password: str) -> bool:
+    def verify(self, password: str, hashed_password: str) -> bool:
         """Verifica se a senha é válida."""
-        return checkpw(
-            password.encode('utf-8'), hashed_password.encode('utf-8')
+        return self.engine_for(hashed_password).verify(
+            password, hashed_password
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Hash gerado com outro algoritmo ou custo diferente do configurado"""
+        engine = self.engine_for(hashed_password)
+        return engine is not self.engine or engine.needs_rehash(
+            hashed_password
         )
 
+    async def hash_async(self, password: str) -> str:
+        """Gera um hash de senha fora do event loop."""
+        return await self.pool.run(self.engine.hash, password)
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        """Verifica a senha fora do event loop."""
+        engine = self.engine_for(hashed_password)
+        return await self.pool.run(engine.verify, password, hashed_password)
+
 
-hash_pass_manager = HashPassManager()
+hash_pass_manager = HashPassManager(
+    HashPassPool(config.hashpass), config.hashpass
+)
 
 
 if __name__ == '__main__':
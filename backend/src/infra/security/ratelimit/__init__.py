@@ -0,0 +1,193 @@
+"""
+Rate limiting das rotas de autenticação (por IP, por username e global)
+
+O limite vale para todos os workers (janela deslizante no Redis). Antes
+do Redis, cada worker mantém token buckets locais com o mesmo limite: se
+só este worker já estourou, a requisição é descartada sem round-trip
+
+O limite de username é contado só pelo username normalizado, em qualquer
+IP: um ataque distribuído contra uma conta esbarra nele. Em troca, um
+terceiro consegue atrasar os logins da vítima por até uma janela
+"""
+
+import ipaddress
+import math
+import time
+from typing import Dict, Optional
+
+from config import RateLimit, config, logger
+from fastapi import HTTPException, Request
+from src.infra.cache import TTLCache
+from src.infra.database.connect.redis import RedisManager, redis_manager
+from src.infra.database.connect.shard import tag
+from src.infra.metrics import metrics
+
+RATE_LIMITED = metrics.counter(
+    'rate_limited_total', 'Requisições recusadas pelo rate limiting'
+)
+
+
+class TokenBucket:
+    """Bucket local: capacidade = limite, reposição = limite / janela"""
+
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated_at')
+
+    def __init__(self, capacity: int, window: int):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def take(self) -> float:
+        """
+        Consome um token
+        Returns:
+            0 se havia token ou segundos até o próximo
+        """
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    def __init__(self, redis: RedisManager, config: RateLimit):
+        self.redis = redis
+        self.enabled = config.enabled
+        self.window = config.window
+        self.limits = {
+            'ip': config.ip,
+            'username': config.username,
+            'global': config.total,
+        }
+        self._buckets = TTLCache(config.local_max_entries, config.window)
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy, strict=False)
+            for proxy in config.trusted_proxies
+        ]
+
+    @staticmethod
+    def key(scope: str, kind: str, value: Optional[str] = None) -> str:
+        # hash tag do escopo: as chaves de uma chamada no mesmo slot
+        if value is None:
+            return f'rate_limit:{tag(scope)}:{kind}'
+        return f'rate_limit:{tag(scope)}:{kind}:{value}'
+
+    @staticmethod
+    def normalize(username: str) -> str:
+        """Mesma forma da busca do signin (lower(username))"""
+        return username.strip().lower()
+
+    def _trusted(self, ip: str) -> bool:
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_proxies)
+
+    def client_ip(self, request: Request) -> Optional[str]:
+        """
+        IP do cliente; vindo de um proxy confiável, o X-Forwarded-For é
+        lido da direita para a esquerda até o primeiro endereço que não é
+        de proxy confiável (o que vem antes pode ter sido forjado)
+        """
+        ip = request.client.host if request.client else None
+        if not ip or not self._trusted(ip):
+            return ip
+
+        forwarded = ','.join(request.headers.getlist('x-forwarded-for'))
+        for hop in reversed(forwarded.split(',')):
+            hop = hop.strip()
+            if hop:
+                ip = hop
+                if not self._trusted(hop):
+                    break
+        return ip
+
+    def _local(self, limits: Dict[str, int]) -> float:
+        """Pré-filtro local; todos os buckets são consumidos"""
+        retry = 0
+        for key, limit in limits.items():
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(limit, self.window)
+            # renova o TTL: bucket parado por uma janela volta cheio
+            self._buckets.set(key, bucket)
+            retry = max(retry, bucket.take())
+        return retry
+
+    async def hit(
+        self, scope: str, ip: Optional[str], username: Optional[str] = None
+    ) -> float:
+        """
+        Conta uma requisição do escopo
+        Args:
+            scope: Nome da rota (ex.: signin)
+            ip: IP do cliente
+            username: Username informado no corpo, se houver
+        Returns:
+            0 se permitida ou segundos até poder tentar de novo
+        """
+        username = self.normalize(username) if username else None
+        candidates = {
+            self.key(scope, 'ip', ip): self.limits['ip'] if ip else 0,
+            self.key(scope, 'user', username): (
+                self.limits['username'] if username else 0
+            ),
+            self.key(scope, 'global'): self.limits['global'],
+        }
+        limits = {key: limit for key, limit in candidates.items() if limit}
+        if not limits:
+            return 0
+
+        retry = self._local(limits)
+        if retry:
+            RATE_LIMITED.inc(scope=scope, source='local')
+            return retry
+
+        try:
+            retry = await self.redis.rate_limit(limits, self.window)
+        except Exception as e:
+            # Redis fora: segue só com o limite local do worker
+            logger.warning(f'Rate limit check failed: {e}')
+            return 0
+        if retry:
+            RATE_LIMITED.inc(scope=scope, source='redis')
+        return retry
+
+    def limit(self, scope: str):
+        """
+        Dependência do FastAPI que responde 429 com Retry-After
+        O username é lido do corpo JSON (já carregado pelo FastAPI)
+        """
+
+        async def dependency(request: Request):
+            if not self.enabled:
+                return
+
+            username = None
+            try:
+                body = await request.json()
+                if isinstance(body, dict) and body.get('username'):
+                    username = str(body['username'])
+            except ValueError:
+                pass
+
+            retry = await self.hit(scope, self.client_ip(request), username)
+            if retry:
+                raise HTTPException(
+                    status_code=429,
+                    detail='Too many requests',
+                    headers={'Retry-After': str(math.ceil(retry))},
+                )
+
+        return dependency
+
+
+# singleton
+rate_limiter = RateLimiter(redis_manager, config.ratelimit)
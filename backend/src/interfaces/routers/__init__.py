@@ -3,9 +3,13 @@ from fastapi import APIRouter, FastAPI
 
 def configure_routers(app: FastAPI):
     from .auth import configure_router as auth_router
+    from .jwks import router as jwks_router
+    from .metrics import router as metrics_router
 
     router = APIRouter(
         prefix='/api',
     )
     auth_router(router)
     app.include_router(router)
+    app.include_router(metrics_router)
+    app.include_router(jwks_router)
@@ -8,6 +8,7 @@ from src.infra.security.auth import (
 
 def configure_router(router_root):
     from .auth import router as auth_router
+    from .session import router as session_router
     from .user import router as user_router
 
     logger.info('include auth router')
@@ -27,5 +28,6 @@ def configure_router(router_root):
             else Depends(get_current_user_cookie)
         ],
     )
+    router.include_router(session_router)
     router_root.include_router(router)
     return router_root
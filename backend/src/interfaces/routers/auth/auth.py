@@ -65,5 +65,4 @@ async def verify(
         conjunto de fields buscados em conjunto
         para aprovar ou rejeitar a solicitação
     """
-    user, payload = auth_response
     pass
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException
+from src.infra.database.connect.session import session_manager
+from src.infra.security.auth import get_current_user
+from src.infra.security.auth.session import SessionData
+
+router = APIRouter(prefix='/sessions')
+
+
+def _user_id(auth: SessionData) -> int:
+    if auth.user is None:
+        # usuário removido com token/sessão ainda válidos
+        raise HTTPException(status_code=401, detail='Unauthorized')
+    return auth.user.id
+
+
+@router.get('')
+async def list_sessions(auth: SessionData = Depends(get_current_user())):
+    """Sessões ativas do usuário (multi-dispositivo)"""
+    user_id = _user_id(auth)
+    current = auth.payload.get('session_id')
+    sessions = await session_manager.list_sessions(user_id)
+    for session in sessions:
+        session['current'] = session['session_id'] == current
+    return sessions
+
+
+@router.delete('/{session_id}')
+async def revoke_session(
+    session_id: str, auth: SessionData = Depends(get_current_user())
+):
+    if not await session_manager.revoke_session(_user_id(auth), session_id):
+        raise HTTPException(status_code=404, detail='Session not found')
+    return {'message': 'session revoked'}
+
+
+@router.delete('')
+async def revoke_all_sessions(
+    auth: SessionData = Depends(get_current_user()),
+):
+    """Logout global: encerra todas as sessões do usuário"""
+    removed = await session_manager.logout_user(_user_id(auth))
+    return {'message': 'sessions revoked', 'count': removed}
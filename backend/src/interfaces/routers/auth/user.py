@@ -1,14 +1,18 @@
-from config import logger
-from fastapi import APIRouter, Depends, Query, Response
+from config import config, logger
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.adapter.controller.user import UserController
+from src.infra.database.connect.session import session_manager
 from src.infra.database.connect.sql import get_session
-from src.interfaces.schema.auth import SignIn, SignUp
+from src.infra.security.auth import get_current_user
+from src.infra.security.auth.revocation import token_revocation
+from src.infra.security.ratelimit import rate_limiter
+from src.interfaces.schema.auth import Refresh, SignIn, SignUp
 
 router = APIRouter()
 
 
-@router.post('/signup')
+@router.post('/signup', dependencies=[Depends(rate_limiter.limit('signup'))])
 async def signup(
     data: SignUp,
     response: Response,
@@ -20,7 +24,7 @@ async def signup(
     return response
 
 
-@router.post('/signin')
+@router.post('/signin', dependencies=[Depends(rate_limiter.limit('signin'))])
 async def signin(
     data: SignIn,
     response: Response,
@@ -32,3 +36,36 @@ async def signin(
 
     response = await user_controller.signin(data, totp)
     return response
+
+
+@router.post('/refresh')
+async def refresh(
+    data: Refresh,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+):
+    user_controller = UserController(session, response)
+    return await user_controller.refresh(data.refresh_token)
+
+
+@router.post('/logout')
+async def logout(
+    response: Response,
+    auth_response=Depends(get_current_user()),
+):
+    """Encerra a sessão atual; no JWT revoga também o token (jti)"""
+    user, payload = auth_response.user, auth_response.payload
+    if user is None:
+        # usuário removido com token/sessão ainda válidos
+        raise HTTPException(status_code=401, detail='Unauthorized')
+    if config.app.auth_method == 'JWT':
+        if 'jti' in payload:
+            await token_revocation.revoke(payload['jti'], payload['exp'])
+    else:
+        response.delete_cookie('session')
+
+    if payload.get('session_id'):
+        await session_manager.logout_session(
+            payload['session_id'], user_id=user.id
+        )
+    return {'message': 'logout successfully'}
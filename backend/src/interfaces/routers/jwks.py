@@ -0,0 +1,24 @@
+from config import config
+from fastapi import APIRouter, HTTPException, Request, Response
+from src.infra.security.auth.jwt import jwt_manager
+
+router = APIRouter(tags=['auth'])
+
+
+@router.get('/.well-known/jwks.json')
+async def jwks(request: Request, response: Response):
+    """Chaves públicas para outros serviços validarem o JWT localmente"""
+    keyring = jwt_manager.keyring
+    if keyring is None:
+        # HS*: segredo compartilhado não é publicado
+        raise HTTPException(status_code=404, detail='Not Found')
+
+    headers = {
+        'Cache-Control': f'public, max-age={config.jwt.jwks_max_age}',
+        'ETag': keyring.etag(),
+    }
+    if request.headers.get('if-none-match') == headers['ETag']:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return keyring.jwks()
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from src.infra.metrics import metrics
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def scrape():
+    return PlainTextResponse(
+        metrics.render(),
+        media_type='text/plain; version=0.0.4',
+    )
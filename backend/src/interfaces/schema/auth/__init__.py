@@ -23,7 +23,9 @@ class SignUp(BaseModel):
 
     @model_validator(mode='after')
     def validate_email(self):
-        emailinfo = validate_email(self.email, check_deliverability=True)
+        # só sintaxe/normalização; o MX é consultado de forma assíncrona
+        # em UserController.create (src.infra.email)
+        emailinfo = validate_email(self.email, check_deliverability=False)
         email = emailinfo.normalized
         self.email = email
         return self
@@ -40,3 +42,7 @@ class SignUp(BaseModel):
 class SignIn(BaseModel):
     username: str = Field(..., min_length=5, max_length=50)
     password: str = Field(..., min_length=8, max_length=30)
+
+
+class Refresh(BaseModel):
+    refresh_token: str = Field(..., min_length=20, max_length=200)
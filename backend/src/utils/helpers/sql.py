@@ -3,7 +3,9 @@ Helpers para operações comuns de banco de dados
 Facilita commit + refresh e outras operações frequentes
 """
 
+from sqlalchemy import inspect, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 
 async def save_and_refresh(session: AsyncSession, *objects) -> None:
@@ -22,6 +24,33 @@ async def save_and_refresh(session: AsyncSession, *objects) -> None:
         await session.refresh(obj)
 
 
+async def release(session: AsyncSession) -> None:
+    """
+    Encerra a transação de leitura em aberto e devolve a conexão ao pool
+    Use antes de trabalho demorado fora do banco (ex.: hash da senha);
+    com expire_on_commit=False os objetos carregados seguem válidos
+    Args:
+        session: Sessão do SQLAlchemy
+    """
+    if session.in_transaction():
+        await session.commit()
+
+
+def insert_or_ignore(session: AsyncSession, model):
+    """
+    INSERT ... ON CONFLICT DO NOTHING no dialeto da sessão
+    Com .returning(...) a linha em conflito simplesmente não volta
+    Args:
+        session: Sessão do SQLAlchemy
+        model: Modelo mapeado
+    """
+    if session.get_bind().dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(model).on_conflict_do_nothing()
+
+
 async def update_and_save(session: AsyncSession, obj, **kwargs) -> None:
     """
     Atualiza atributos de um objeto e salva
@@ -35,3 +64,72 @@ async def update_and_save(session: AsyncSession, obj, **kwargs) -> None:
             setattr(obj, key, value)
 
     await save_and_refresh(session, obj)
+
+
+class UnitOfWork:
+    """
+    Acumula alterações em modelos durante a requisição e grava tudo no
+    commit com um único UPDATE ... RETURNING por objeto, sem refresh
+    O RETURNING traz só as colunas alteradas e as preenchidas pelo UPDATE
+    Os valores são aplicados no objeto sem marcá-lo como sujo, então o
+    flush do ORM não repete o UPDATE
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._pending: dict[int, tuple[object, dict]] = {}
+
+    def set(self, obj, **values) -> None:
+        """
+        Registra alterações de atributos para o próximo commit
+        Args:
+            obj: Objeto persistente (já carregado pela sessão)
+            **values: Atributos para atualizar
+        """
+        for key, value in values.items():
+            set_committed_value(obj, key, value)
+        _, changes = self._pending.setdefault(id(obj), (obj, {}))
+        changes.update(values)
+
+    async def flush(self) -> None:
+        """Executa os UPDATEs pendentes dentro da transação atual"""
+        pending, self._pending = self._pending, {}
+
+        for obj, changes in pending.values():
+            mapper = inspect(obj).mapper
+            table = mapper.local_table
+            identity = mapper.primary_key_from_instance(obj)
+            values = {
+                mapper.get_property(k).columns[0]: v
+                for k, v in changes.items()
+            }
+            # volta só o que mudou e o que o UPDATE gera (ex.: updated_at)
+            columns = list(values) + [
+                col
+                for col in table.columns
+                if col not in values
+                and (col.onupdate is not None or col.server_onupdate)
+            ]
+
+            stmt = (
+                update(table)
+                .where(
+                    *(
+                        col == val
+                        for col, val in zip(mapper.primary_key, identity)
+                    )
+                )
+                .values(values)
+                .returning(*columns)
+            )
+            row = (await self.session.execute(stmt)).one()
+
+            # sincroniza valores gerados no UPDATE
+            for column, value in zip(columns, row):
+                key = mapper.get_property_by_column(column).key
+                set_committed_value(obj, key, value)
+
+    async def commit(self) -> None:
+        """Grava as alterações pendentes e faz commit"""
+        await self.flush()
+        await self.session.commit()
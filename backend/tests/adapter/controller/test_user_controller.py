@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import select
+from src.adapter.controller import user as controller_module
+from src.adapter.controller.user import UserController, _rehash_password
+from src.infra.database.model.user import UserModel
+
+
+async def test_third_failed_attempt_blocks_user(
+    fake_redis, db_session, user_model
+):
+    controller = UserController(db_session, Response())
+
+    for rest in (2, 1, 0):
+        with pytest.raises(HTTPException) as error:
+            await controller._register_failed_attempt(user_model, 'invalid')
+        assert error.value.status_code == 401
+        assert json.loads(error.value.detail)['rest_attemps'] == rest
+
+    blocked, attempts = (
+        await db_session.execute(
+            select(UserModel.blocked, UserModel.attempts).where(
+                UserModel.id == user_model.id
+            )
+        )
+    ).one()
+    assert blocked is True and attempts == 3
+    # só o bloqueio vai ao banco; as falhas anteriores ficam no Redis
+    updates = [
+        s for s in db_session.info['statements'] if s.startswith('UPDATE')
+    ]
+    assert len(updates) == 1
+
+
+async def test_failed_attempts_never_expire_until_a_successful_login(
+    fake_redis, db_session, user_model
+):
+    controller = UserController(db_session, Response())
+    key = controller._attempts_key(user_model.id)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await controller._register_failed_attempt(user_model, 'invalid')
+    # sem TTL: duas falhas por janela não escapam do bloqueio
+    assert await controller.redis_manager.redis.ttl(key) == -1
+
+    await controller._finalize_login(user_model)
+    assert await controller.redis_manager.redis.exists(key) == 0
+
+    with pytest.raises(HTTPException) as error:
+        await controller._register_failed_attempt(user_model, 'invalid')
+    assert json.loads(error.value.detail)['rest_attemps'] == 2
+
+
+async def test_failed_attempts_resume_from_the_database_column(
+    fake_redis, db_session, user_model
+):
+    controller = UserController(db_session, Response())
+    user_model.attempts = 2
+
+    with pytest.raises(HTTPException) as error:
+        await controller._register_failed_attempt(user_model, 'invalid')
+
+    assert json.loads(error.value.detail)['rest_attemps'] == 0
+    assert user_model.blocked is True
+
+
+async def test_rehash_replaces_an_outdated_hash(
+    fake_redis, db_session, user_model, monkeypatch
+):
+    manager = controller_module.hash_pass_manager
+    cheap = manager.config.model_copy(update={'bcrypt_rounds': 4})
+    monkeypatch.setattr(
+        controller_module,
+        'hash_pass_manager',
+        type(manager)(manager.pool, cheap),
+    )
+    monkeypatch.setattr(controller_module, 'Session', lambda: db_session)
+
+    await _rehash_password(user_model.id, 'secret', 'hash')
+
+    stored = await db_session.scalar(
+        select(UserModel.password).where(UserModel.id == user_model.id)
+    )
+    assert stored.startswith('$2b$04$')
+    assert controller_module.hash_pass_manager.verify('secret', stored)
@@ -0,0 +1,106 @@
+from sqlalchemy import select
+from src.adapter.repository.user import UserRepository
+from src.infra.cache.user import user_cache
+from src.infra.database.model.user import UserModel
+from src.interfaces.schema.auth import SignUp
+
+
+async def test_update_password_hash_invalidates_cached_user(
+    fake_redis, db_session, user_model
+):
+    repository = UserRepository(db_session)
+    user_cache.cache.set(
+        user_model.id, await repository.get_principal(user_model.id)
+    )
+
+    assert await repository.update_password_hash(user_model.id, 'hash', 'new')
+    assert user_cache.cache.get(user_model.id) is None
+
+    # hash já trocado: nada a gravar nem a invalidar
+    user_cache.cache.set(user_model.id, object())
+    assert not await repository.update_password_hash(
+        user_model.id, 'hash', 'newer'
+    )
+    assert user_cache.cache.get(user_model.id) is not None
+    user_cache.cache.pop(user_model.id)
+
+
+async def _stored_hash(session, user_id) -> str:
+    return await session.scalar(
+        select(UserModel.password).where(UserModel.id == user_id)
+    )
+
+
+async def test_update_password_hash_keeps_a_concurrent_change(
+    fake_redis, db_session, user_model
+):
+    repository = UserRepository(db_session)
+    # troca de senha concorrente depois do login que leu 'hash'
+    assert await repository.update_password_hash(
+        user_model.id, 'hash', 'changed'
+    )
+
+    assert not await repository.update_password_hash(
+        user_model.id, 'hash', 'rehashed'
+    )
+    assert await _stored_hash(db_session, user_model.id) == 'changed'
+
+
+def _signup(**update) -> SignUp:
+    data = {
+        'name': 'Bruno Lima',
+        'email': 'bruno@example.com',
+        'phone': '11 99999-0000',
+        'document': '123.456.789-00',
+        'username': 'bruno',
+        'password': 'S3nh@Forte!',
+    } | update
+    return SignUp(**data)
+
+
+async def test_create_returns_none_when_username_or_email_is_taken(
+    db_session,
+):
+    repository = UserRepository(db_session)
+    created = await repository.create(_signup())
+    assert created.id and created.username == 'bruno'
+
+    # ON CONFLICT DO NOTHING: nenhuma exceção, só nada volta
+    assert await repository.create(_signup(email='outro@example.com')) is None
+    assert await repository.create(_signup(username='outro')) is None
+
+
+def _lookups(session) -> list[str]:
+    """Colunas consultadas pelo login, na ordem"""
+    return [
+        'email' if 'lower(users.email)' in s else 'username'
+        for s in session.info['statements']
+        if s.startswith('SELECT')
+    ]
+
+
+async def test_find_for_signin_ignores_case(db_session, user_model):
+    repository = UserRepository(db_session)
+
+    found = await repository.find_for_signin('ANA@Example.COM')
+    assert found.id == user_model.id
+    found = await repository.find_for_signin('AnA')
+    assert found.id == user_model.id
+    # sem '@': só a busca por username
+    assert _lookups(db_session) == ['email', 'username']
+    assert await repository.find_for_signin('bia') is None
+
+
+async def test_find_for_signin_falls_back_to_username_with_at(
+    db_session, user_model
+):
+    repository = UserRepository(db_session)
+    other = await repository.create(
+        _signup(username='ana@home', email='bruno@example.com')
+    )
+    db_session.info['statements'].clear()
+
+    # parece email mas é username: tenta o email e cai no username
+    found = await repository.find_for_signin('Ana@Home')
+    assert found.id == other.id
+    assert _lookups(db_session) == ['email', 'username']
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND))
+# config lê o .env do diretório atual
+os.chdir(BACKEND)
+
+from config import logger  # noqa: E402
+
+# o import de config registra logs/app.log; os testes logam só no stderr
+logger.remove()
+logger.add(sys.stderr, level='WARNING')
+
+
+@pytest.fixture
+def wait_for():
+    """Aguarda uma condição alimentada por tarefas em segundo plano"""
+
+    async def wait(predicate, timeout: float = 2):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not predicate():
+            assert asyncio.get_running_loop().time() < deadline
+            await asyncio.sleep(0.01)
+
+    return wait
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """
+    Troca os pools do Redis por servidores em memória (fakeredis com Lua),
+    um por host:porta: cada nó de REDIS_SHARDS tem os próprios dados
+    Managers criados dentro do teste usam o fake; scripts Lua e pub/sub
+    rodam como no Redis real
+    Returns:
+        Servidores por (host, porta)
+    """
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    import redis.asyncio as redis
+    from src.infra.database.connect import redis as module
+
+    servers = {}
+
+    def get_pool(config):
+        key = (config.host, str(config.port), config.db)
+        if key not in module._pools:
+            server = servers.setdefault(key[:2], fakeredis.FakeServer())
+            module._pools[key] = redis.ConnectionPool(
+                connection_class=fakeredis.FakeAsyncConnection,
+                server=server,
+                db=config.db,
+                decode_responses=True,
+            )
+        return module._pools[key]
+
+    monkeypatch.setattr(module, '_pools', {})
+    monkeypatch.setattr(module, '_pubsub_pools', {})
+    monkeypatch.setattr(module, 'get_pool', get_pool)
+    # singleton criado no import (caches, rate limit, contadores)
+    monkeypatch.setattr(
+        module.redis_manager.redis,
+        'connection_pool',
+        get_pool(module.config.redis),
+    )
+    return servers
+
+
+@pytest.fixture
+async def db_session():
+    """
+    Sessão em um SQLite em memória com as tabelas dos modelos
+    session.info['statements'] guarda o SQL enviado ao banco
+    """
+    pytest.importorskip('aiosqlite')
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import (
+        AsyncSession,
+        async_sessionmaker,
+        create_async_engine,
+    )
+    from src.infra.database.connect.sql import register
+    from src.infra.database.model.user import UserModel  # noqa: F401
+
+    engine = create_async_engine('sqlite+aiosqlite://')
+    async with engine.begin() as conn:
+        await conn.run_sync(register.metadata.create_all)
+
+    statements = []
+
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def collect(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    Session = async_sessionmaker(
+        engine,
+        expire_on_commit=False,
+        autoflush=False,
+        class_=AsyncSession,
+    )
+    async with Session() as session:
+        session.info['statements'] = statements
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def user_model(db_session):
+    from src.infra.database.model.user import UserModel
+
+    user = UserModel(
+        name='Ana',
+        email='ana@example.com',
+        phone=None,
+        document='123',
+        username='ana',
+        password='hash',
+    )
+    db_session.add(user)
+    await db_session.commit()
+    db_session.info['statements'].clear()
+    return user
+
+
+@pytest.fixture
+def redis_config():
+    from config import config
+
+    return config.redis.model_copy(
+        update={'host': 'fake', 'port': '6379', 'db': 0, 'shards': []}
+    )
@@ -0,0 +1,27 @@
+from config import config
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.infra.cache.signup import SignupFilter
+from src.infra.database.connect import sql
+from src.infra.database.connect.redis import RedisManager
+
+
+async def test_filter_is_built_off_the_loop_and_synced(
+    fake_redis, redis_config, db_session, user_model, monkeypatch, wait_for
+):
+    monkeypatch.setattr(
+        sql,
+        'Session',
+        async_sessionmaker(db_session.bind, class_=AsyncSession),
+    )
+    signup = SignupFilter(config.cache, RedisManager(redis_config))
+    # antes da carga toda consulta vai ao banco
+    assert signup.might_exist('livre', 'livre@example.com')
+
+    signup.start()
+    try:
+        await wait_for(lambda: signup.synced)
+        assert signup.might_exist('ANA', 'livre@example.com')
+        assert signup.might_exist('livre', 'ana@example.com')
+        assert not signup.might_exist('livre', 'livre@example.com')
+    finally:
+        await signup.stop()
@@ -0,0 +1,33 @@
+import asyncio
+
+from config import config
+from src.core.domain.user import AuthPrincipal
+from src.infra.cache.user import UserCache
+from src.infra.database.connect.redis import RedisManager
+
+
+async def test_listener_does_not_hold_a_pooled_connection(
+    fake_redis, redis_config, wait_for
+):
+    manager = RedisManager(redis_config)
+    pool = manager.redis.connection_pool
+    worker, other = (UserCache(config.cache, manager) for _ in range(2))
+    worker.start()
+    try:
+        # inscrito no canal (o listener limpa o cache ao se inscrever)
+        await wait_for(lambda: worker._invalidations > 0)
+        principal = AuthPrincipal(
+            id=1,
+            username='ana',
+            email='ana@example.com',
+            blocked=False,
+            allowed=True,
+            version=0,
+        )
+        worker.cache.set(1, principal)
+        assert not pool._in_use_connections
+
+        await other.invalidate(1)
+        await wait_for(lambda: worker.cache.get(1) is None)
+    finally:
+        await worker.stop()
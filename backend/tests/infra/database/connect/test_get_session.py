@@ -0,0 +1,13 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.infra.database.connect.sql import engine, get_session
+
+
+async def test_get_session_does_not_check_out_a_connection():
+    dependency = get_session()
+    session = await anext(dependency)
+    try:
+        assert type(session) is AsyncSession
+        # requisições que não tocam o banco não ocupam o pool
+        assert engine.pool.checkedout() == 0
+    finally:
+        await dependency.aclose()
@@ -0,0 +1,101 @@
+from types import SimpleNamespace
+
+import pytest
+from src.infra.database.connect import memory
+from src.infra.database.connect.memory import MemorySessionStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio manual no lugar de time.time() do módulo"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(
+        memory, 'time', SimpleNamespace(time=lambda: now.value)
+    )
+    return now
+
+
+async def test_session_expires_after_ttl(clock):
+    store = MemorySessionStore()
+    await store.create('a', {'id': 1}, ttl=60)
+
+    clock.value += 59
+    assert await store.get_session_data('a') == {'id': 1}
+    clock.value += 1
+    assert await store.get_session_data('a') is None
+    assert await store.get_user_session_id(1) is None
+    assert await store.list_sessions(1) == []
+
+
+async def test_least_recently_used_session_is_evicted(clock):
+    store = MemorySessionStore(max_entries=2)
+    await store.create('a', {'id': 1}, ttl=60)
+    await store.create('b', {'id': 2}, ttl=60)
+    # leitura renova a posição de 'a'; 'b' passa a ser a mais antiga
+    await store.get_session_data('a')
+    await store.create('c', {'id': 3}, ttl=60)
+
+    assert await store.get_session_data('b') is None
+    assert await store.get_session_data('a') is not None
+    assert await store.get_session_data('c') is not None
+    assert await store.list_sessions(2) == []
+
+
+async def test_previous_session_replaces_the_pointer(clock):
+    store = MemorySessionStore()
+    assert await store.previous_session('a', {'id': 1}, ttl=60) is False
+    assert await store.previous_session('b', {'id': 1}, ttl=60) is True
+
+    assert await store.get_session_data('a') is None
+    assert await store.get_user_session_id(1) == 'b'
+    assert [s['session_id'] for s in await store.list_sessions(1)] == ['b']
+
+
+async def test_revoke_session_checks_the_owner(clock):
+    store = MemorySessionStore()
+    await store.create('a', {'id': 1}, ttl=60)
+
+    assert await store.revoke_session(2, 'a') is False
+    assert await store.get_session_data('a') is not None
+    assert await store.revoke_session(1, 'a') is True
+    assert await store.get_session_data('a') is None
+    assert await store.revoke_session(1, 'a') is False
+
+
+async def test_logout_user_and_list_sessions(clock):
+    store = MemorySessionStore()
+    await store.create('a', {'id': 1}, ttl=60)
+    await store.create('b', {'id': 1}, ttl=30)
+    await store.create('c', {'id': 2}, ttl=60)
+
+    sessions = await store.list_sessions(1)
+    # ordenadas pela expiração
+    assert [s['session_id'] for s in sessions] == ['b', 'a']
+    assert sessions[0]['expires_at'] == clock.value + 30
+
+    assert await store.logout_user(1) == 2
+    assert await store.list_sessions(1) == []
+    assert await store.get_user_session_id(1) is None
+    assert await store.get_session_data('c') is not None
+
+
+async def test_touch_extends_only_below_the_threshold(clock):
+    store = MemorySessionStore(
+        sliding=True, sliding_ttl=3600, sliding_threshold=900
+    )
+    await store.create('a', {'id': 1}, ttl=3600)
+
+    clock.value += 3600 - 900
+    # ainda faltam 900s: não estende
+    assert store.touch('a', 1) is False
+    clock.value += 1
+    assert store.touch('a', 1) is True
+
+    (session,) = await store.list_sessions(1)
+    assert session['expires_at'] == clock.value + 3600
+
+
+async def test_touch_is_off_without_sliding_sessions(clock):
+    store = MemorySessionStore(sliding=False)
+    await store.create('a', {'id': 1}, ttl=10)
+    assert store.touch('a', 1) is False
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+from src.infra.database.connect import redis as module
+from src.infra.database.connect.redis import NearCache, RedisManager
+
+
+class FakeConnection:
+    """
+    Conexão dedicada do near-cache: registra os comandos e devolve as
+    respostas enfileiradas (o teste faz o papel do servidor)
+    """
+
+    def __init__(self):
+        self.commands = []
+        self.responses = asyncio.Queue()
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def send_command(self, *args):
+        self.commands.append(args)
+
+    async def read_response(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.responses.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+@pytest.fixture
+def manager(fake_redis, redis_config):
+    return RedisManager(
+        redis_config.model_copy(
+            update={
+                'near_cache': True,
+                'near_cache_prefixes': ['session:'],
+            }
+        ),
+        near_cache=True,
+    )
+
+
+@pytest.fixture
+async def tracking(manager, monkeypatch, wait_for):
+    """Near-cache com o tracking ativo sobre conexões falsas"""
+    listener, tracker = FakeConnection(), FakeConnection()
+    connections = iter([listener, tracker])
+    monkeypatch.setattr(
+        manager.near_cache, '_connection', lambda: next(connections)
+    )
+    for response in (7, ['subscribe', NearCache.CHANNEL, 1]):
+        listener.responses.put_nowait(response)
+    tracker.responses.put_nowait('OK')
+
+    manager.near_cache.start()
+    await wait_for(lambda: manager.near_cache.active)
+    yield listener, tracker
+    await manager.near_cache.stop()
+
+
+def _counters():
+    return (
+        module.NEAR_CACHE_HITS.value(),
+        module.NEAR_CACHE_MISSES.value(),
+        module.NEAR_CACHE_INVALIDATIONS.value(),
+    )
+
+
+async def test_tracking_is_redirected_to_the_listener(manager, tracking):
+    listener, tracker = tracking
+    assert listener.commands[0] == ('CLIENT', 'ID')
+    assert tracker.commands[0] == (
+        'CLIENT',
+        'TRACKING',
+        'ON',
+        'REDIRECT',
+        7,
+        'BCAST',
+        'PREFIX',
+        'session:',
+    )
+
+
+async def test_hits_misses_and_invalidation_on_write(
+    manager, tracking, wait_for
+):
+    listener, _ = tracking
+    await manager.insert('session:a', 'v1', 60)
+    hits, misses, invalidations = _counters()
+
+    assert await manager.cached_search('session:a') == 'v1'
+    assert await manager.cached_search('session:a') == 'v1'
+    assert _counters() == (hits + 1, misses + 1, invalidations)
+
+    # escrita de outro cliente: o servidor publica a invalidação
+    await manager.insert('session:a', 'v2', 60)
+    listener.responses.put_nowait(
+        ['message', NearCache.CHANNEL, ['session:a']]
+    )
+    await wait_for(lambda: 'session:a' not in manager.near_cache.cache)
+
+    assert await manager.cached_search('session:a') == 'v2'
+    assert _counters() == (hits + 1, misses + 2, invalidations + 1)
+
+
+async def test_prefixes_outside_tracking_skip_the_cache(manager, tracking):
+    await manager.insert('other:a', 'v1', 60)
+    assert await manager.cached_search('other:a') == 'v1'
+    assert 'other:a' not in manager.near_cache.cache
+
+
+async def test_lost_tracking_drops_every_entry(manager):
+    near_cache = manager.near_cache
+    near_cache.active = True
+    await manager.insert('session:a', 'v1', 60)
+    await manager.cached_search('session:a')
+    assert 'session:a' in near_cache.cache
+
+    # FLUSHDB ou reconexão: invalidação sem chaves
+    near_cache._invalidate(None)
+    assert len(near_cache.cache) == 0
+
+
+@pytest.mark.parametrize('keys', [['session:a'], None])
+async def test_invalidation_during_fetch_is_not_cached(manager, keys):
+    near_cache = manager.near_cache
+    near_cache.active = True
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def loader(key):
+        started.set()
+        await release.wait()
+        return 'old'
+
+    fetch = asyncio.create_task(near_cache.get('session:a', loader))
+    await started.wait()
+    # chave invalidada (ou epoch novo) com a leitura em voo
+    near_cache._invalidate(keys)
+    release.set()
+
+    assert await fetch == 'old'
+    assert 'session:a' not in near_cache.cache
+    assert near_cache._loading == {} and near_cache._stale == set()
+
+    # a próxima leitura volta a popular o cache
+    async def fresh(key):
+        return 'new'
+
+    assert await near_cache.get('session:a', fresh) == 'new'
+    assert near_cache.cache.get('session:a') == 'new'
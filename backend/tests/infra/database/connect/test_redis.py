@@ -0,0 +1,185 @@
+import pytest
+from src.infra.database.connect.redis import SessionManager
+from src.infra.database.connect.shard import hash_tag
+
+LAYOUTS = ['string', 'hash']
+CODECS = ['json', 'orjson', 'msgpack']
+
+
+@pytest.fixture(params=[(l, c) for l in LAYOUTS for c in CODECS])
+def sessions(request, fake_redis, redis_config):
+    layout, codec = request.param
+    return SessionManager(
+        redis_config.model_copy(
+            update={
+                'session_layout': layout,
+                'session_codec': codec,
+                'near_cache': False,
+                'sliding_sessions': False,
+            }
+        )
+    )
+
+
+async def test_session_lifecycle(sessions):
+    data = {'id': 7, 'role': 'admin', 'flags': [1, 2]}
+    session_id = await sessions.create(sessions.new_session_id(7), data, 60)
+
+    assert await sessions.get_session_data(session_id) == data
+    assert await sessions.get_session_fields(session_id, 'role') == {
+        'role': 'admin'
+    }
+
+    assert await sessions.update_session_fields(session_id, role='user')
+    assert (await sessions.get_session_data(session_id))['role'] == 'user'
+
+    assert await sessions.extend_session(session_id, 120, user_id=7)
+    key = sessions.session_key(session_id)
+    assert 60 < await sessions.redis.ttl(key) <= 120
+
+    [listed] = await sessions.list_sessions(7)
+    assert listed['session_id'] == session_id
+
+    assert await sessions.logout_session(session_id)
+    assert await sessions.get_session_data(session_id) is None
+    assert await sessions.list_sessions(7) == []
+
+
+async def test_previous_session_replaces_the_active_one(sessions):
+    first = sessions.new_session_id(7)
+    assert not await sessions.previous_session(first, {'id': 7}, 60)
+    assert await sessions.get_user_session_id(7) == first
+
+    second = sessions.new_session_id(7)
+    assert await sessions.previous_session(second, {'id': 7}, 60)
+    assert await sessions.get_user_session_id(7) == second
+    assert await sessions.get_session_data(first) is None
+    assert await sessions.get_session_data(second) == {'id': 7}
+
+
+async def test_logout_user_removes_every_session(sessions):
+    for _ in range(3):
+        await sessions.create(sessions.new_session_id(7), {'id': 7}, 60)
+    await sessions.create(sessions.new_session_id(8), {'id': 8}, 60)
+
+    assert await sessions.logout_user(7) == 3
+    assert await sessions.list_sessions(7) == []
+    assert len(await sessions.list_sessions(8)) == 1
+
+
+async def test_reads_sessions_written_in_the_other_layout(sessions):
+    # sessão gravada antes da troca de SESSION_LAYOUT
+    layout = sessions.layout
+    sessions.layout = 'hash' if layout == 'string' else 'string'
+    session_id = await sessions.create(
+        sessions.new_session_id(7), {'id': 7, 'name': 'Ana'}, 60
+    )
+    sessions.layout = layout
+
+    assert await sessions.get_session_data(session_id) == {
+        'id': 7,
+        'name': 'Ana',
+    }
+
+
+async def test_previous_session_keys_share_the_user_hash_tag(
+    fake_redis, redis_config
+):
+    sessions = SessionManager(
+        redis_config.model_copy(
+            update={'shards': ['fake-a:6379', 'fake-b:6379']}
+        )
+    )
+    script = sessions.previous_session_script
+    calls = []
+
+    async def spy(keys, args, client):
+        calls.append(keys)
+        return await script(keys=keys, args=args, client=client)
+
+    sessions.previous_session_script = spy
+    for _ in range(2):
+        await sessions.previous_session(
+            sessions.new_session_id(42), {'id': 42}, 60
+        )
+
+    # sem e com sessão anterior: todas as chaves no nó do usuário
+    for keys in calls:
+        assert {hash_tag(key) for key in keys} == {'42'}
+    owner = sessions.ring.owner(sessions.user_session_key(42))
+    for name, client in sessions.ring.nodes.items():
+        assert bool(await client.keys('*')) == (name == owner)
+
+
+def _sharded(redis_config, *shards) -> SessionManager:
+    return SessionManager(
+        redis_config.model_copy(
+            update={
+                'shards': list(shards),
+                'near_cache': False,
+                'sliding_sessions': False,
+            }
+        )
+    )
+
+
+async def _keys_by_node(sessions) -> dict:
+    return {
+        name: set(await client.keys('*'))
+        for name, client in sessions.ring.nodes.items()
+    }
+
+
+async def test_sessions_are_spread_across_the_shards(fake_redis, redis_config):
+    sessions = _sharded(redis_config, 'fake-a:6379', 'fake-b:6379')
+    ids = {}
+    for user_id in range(40):
+        ids[user_id] = await sessions.create(
+            sessions.new_session_id(user_id), {'id': user_id}, 60
+        )
+
+    by_node = await _keys_by_node(sessions)
+    # cada nó é um servidor próprio e recebe parte dos usuários
+    assert all(by_node.values())
+    assert not set.intersection(*by_node.values())
+    for name, keys in by_node.items():
+        assert {sessions.ring.owner(key) for key in keys} == {name}
+
+    for user_id, session_id in ids.items():
+        assert await sessions.get_session_data(session_id) == {'id': user_id}
+
+
+async def test_rebalance_moves_keys_to_the_new_shard(fake_redis, redis_config):
+    before = _sharded(redis_config, 'fake-a:6379', 'fake-b:6379')
+    ids = {}
+    for user_id in range(60):
+        ids[user_id] = await before.create(
+            before.new_session_id(user_id), {'id': user_id}, 60
+        )
+    old_owner = {
+        key: name
+        for name, keys in (await _keys_by_node(before)).items()
+        for key in keys
+    }
+
+    after = _sharded(redis_config, 'fake-a:6379', 'fake-b:6379', 'fake-c:6379')
+    moving = {
+        k for k, name in old_owner.items() if after.ring.owner(k) != name
+    }
+    # hashing consistente: só as chaves do nó novo mudam de dono
+    assert moving
+    assert {after.ring.owner(key) for key in moving} == {'fake-c:6379'}
+
+    assert await after.rebalance(batch=7) == len(moving)
+
+    by_node = await _keys_by_node(after)
+    assert set.union(*by_node.values()) == set(old_owner)
+    assert by_node['fake-c:6379'] == moving
+    for name, keys in by_node.items():
+        assert {after.ring.owner(key) for key in keys} == {name}
+    for user_id, session_id in ids.items():
+        assert await after.get_session_data(session_id) == {'id': user_id}
+        key = after.session_key(session_id)
+        assert 0 < await after.node(key).ttl(key) <= 60
+    # segunda execução: nada fora do lugar
+    assert await after.rebalance() == 0
@@ -0,0 +1,73 @@
+import orjson
+import pytest
+from src.infra.database.connect.redis import RedisManager, SessionManager
+
+
+@pytest.fixture
+def manager(fake_redis, redis_config):
+    return RedisManager(redis_config)
+
+
+@pytest.fixture
+def sharded(fake_redis, redis_config):
+    # node() de SessionManager distribui as chaves entre os servidores
+    return SessionManager(
+        redis_config.model_copy(
+            update={
+                'shards': ['fake-a:6379', 'fake-b:6379'],
+                'near_cache': False,
+                'sliding_sessions': False,
+            }
+        )
+    )
+
+
+async def test_search_many_keeps_order_and_misses(manager):
+    await manager.insert_many({'b': '2', 'a': '1', 'd': {'x': 1}}, 60)
+
+    assert await manager.search_many(['a', 'missing', 'b', 'd']) == [
+        '1',
+        None,
+        '2',
+        orjson.dumps({'x': 1}).decode(),
+    ]
+    assert await manager.search_many(['a', 'missing'], raw=True) == [
+        b'1',
+        None,
+    ]
+    assert 0 < await manager.redis.ttl('a') <= 60
+
+
+async def test_delete_and_expire_many_count_existing_keys(manager):
+    await manager.insert_many({'a': '1', 'b': '2'}, 60)
+
+    assert await manager.expire_many(['a', 'missing', 'b'], 600) == 2
+    assert 60 < await manager.redis.ttl('b') <= 600
+    assert await manager.delete_many(['a', 'missing']) == 1
+    assert await manager.search_many(['a', 'b']) == [None, '2']
+
+
+async def test_pipeline_sends_pending_commands_on_exit(manager):
+    async with manager.pipeline() as pipe:
+        pipe.set('a', '1')
+        pipe.incr('counter')
+    assert await manager.search_many(['a', 'counter']) == ['1', '1']
+
+    async with manager.pipeline(transaction=True) as pipe:
+        pipe.incr('counter')
+        pipe.get('a')
+        assert await pipe.execute() == [2, '1']
+
+
+async def test_batches_keep_order_across_shards(sharded):
+    keys = [f'session:{{{user_id}}}x' for user_id in range(20)]
+    values = {key: str(i) for i, key in enumerate(keys) if i % 3}
+    await sharded.insert_many(values, 60)
+
+    # as chaves ficam em nós diferentes
+    assert len({sharded.ring.owner(key) for key in values}) == 2
+    assert await sharded.search_many(keys) == [values.get(key) for key in keys]
+
+    assert await sharded.expire_many(keys, 600) == len(values)
+    assert await sharded.delete_many(reversed(keys)) == len(values)
+    assert await sharded.search_many(keys) == [None] * len(keys)
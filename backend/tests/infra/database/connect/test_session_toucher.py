@@ -0,0 +1,76 @@
+import pytest
+from src.infra.database.connect.redis import SessionManager
+
+
+@pytest.fixture
+def sessions(fake_redis, redis_config):
+    return SessionManager(
+        redis_config.model_copy(
+            update={
+                'near_cache': False,
+                'sliding_sessions': True,
+                'ttl': 3600,
+                'sliding_threshold': 900,
+                'sliding_flush_ms': 60000,
+            }
+        )
+    )
+
+
+async def _session(sessions, user_id: int, ttl: int) -> str:
+    session_id = sessions.new_session_id(user_id)
+    await sessions.create(session_id, {'id': user_id}, ttl)
+    return session_id
+
+
+async def test_extends_only_below_the_threshold(sessions):
+    # restam 3000s (acima de 900): não estende
+    fresh = await _session(sessions, 1, 3000)
+    expiring = await _session(sessions, 2, 600)
+
+    assert sessions.touch(fresh, 1) and sessions.touch(expiring, 2)
+    await sessions.toucher.flush()
+
+    assert await sessions.redis.ttl(sessions.session_key(fresh)) <= 3000
+    assert await sessions.redis.ttl(sessions.session_key(expiring)) > 3500
+    assert 3500 < await sessions.redis.ttl(sessions.user_session_key(2))
+
+
+async def test_fresh_session_is_not_queued_again(sessions):
+    session_id = await _session(sessions, 1, 3600)
+    assert sessions.touch(session_id, 1)
+    # já na fila: não duplica
+    assert not sessions.touch(session_id, 1)
+    await sessions.toucher.flush()
+
+    # TTL devolvido acima do limite: próximo toque só perto do fim
+    assert not sessions.touch(session_id, 1)
+    assert sessions.toucher._pending == {}
+
+
+async def test_touches_are_flushed_in_one_pipeline(sessions, monkeypatch):
+    session_ids = [await _session(sessions, i, 600) for i in range(5)]
+    pipelines = []
+    pipeline = sessions.redis.pipeline
+
+    def counting(*args, **kwargs):
+        pipelines.append(kwargs)
+        return pipeline(*args, **kwargs)
+
+    monkeypatch.setattr(sessions.redis, 'pipeline', counting)
+    for i, session_id in enumerate(session_ids):
+        sessions.touch(session_id, i)
+    # nada vai ao Redis antes do flush
+    assert pipelines == []
+
+    await sessions.toucher.flush()
+    assert pipelines == [{'transaction': False}]
+    for session_id in session_ids:
+        key = sessions.session_key(session_id)
+        assert await sessions.redis.ttl(key) > 3500
+
+
+async def test_missing_session_is_not_recreated(sessions):
+    assert sessions.touch('gone', 1)
+    await sessions.toucher.flush()
+    assert await sessions.redis.exists(sessions.session_key('gone')) == 0
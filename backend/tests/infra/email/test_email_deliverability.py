@@ -0,0 +1,150 @@
+import asyncio
+from types import SimpleNamespace
+
+import dns.exception
+import dns.resolver
+import pytest
+from config import config
+from fastapi import HTTPException
+from src.infra import cache
+from src.infra.email import EmailDeliverability
+
+
+class StubResolver:
+    """
+    Respostas por (domínio, tipo): lista de registros ou exceção
+    gate, se definido, segura as consultas até ser liberado
+    """
+
+    def __init__(self, answers: dict):
+        self.answers = answers
+        self.calls = []
+        self.gate = None
+
+    async def resolve(self, domain, rdtype):
+        self.calls.append((domain, rdtype))
+        if self.gate is not None:
+            await self.gate.wait()
+        answer = self.answers.get((domain, rdtype), dns.resolver.NoAnswer())
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def mx(*exchanges):
+    return [SimpleNamespace(exchange=e) for e in exchanges]
+
+
+def address(*ips):
+    return [SimpleNamespace(address=ip) for ip in ips]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio manual do TTLCache"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(
+        cache, 'time', SimpleNamespace(monotonic=lambda: now.value)
+    )
+    return now
+
+
+def _checker(answers: dict) -> EmailDeliverability:
+    settings = config.email.model_copy(
+        update={
+            'check_deliverability': True,
+            'cache_ttl': 3600,
+            'cache_negative_ttl': 300,
+        }
+    )
+    checker = EmailDeliverability(settings)
+    checker._resolver = StubResolver(answers)
+    return checker
+
+
+async def test_mx_domain_is_accepted(clock):
+    checker = _checker({('gmail.com', 'MX'): mx('smtp.gmail.com.')})
+    await checker.check('ana@Gmail.com')
+    assert checker._resolver.calls == [('gmail.com', 'MX')]
+
+
+async def test_null_mx_is_rejected(clock):
+    # RFC 7505: 0 "."
+    checker = _checker({('nomail.com', 'MX'): mx('.')})
+    with pytest.raises(HTTPException) as error:
+        await checker.check('ana@nomail.com')
+    assert error.value.status_code == 400
+    assert 'does not accept email' in error.value.detail
+
+
+async def test_nxdomain_is_rejected(clock):
+    checker = _checker({('nope.com', 'MX'): dns.resolver.NXDOMAIN()})
+    reason = await checker.undeliverable('nope.com')
+    assert reason == 'The domain name nope.com does not exist.'
+
+
+async def test_falls_back_to_a_and_aaaa_records(clock):
+    checker = _checker(
+        {
+            ('a.com', 'A'): address('93.184.216.34'),
+            ('aaaa.com', 'AAAA'): address('2606:4700::1'),
+            ('private.com', 'A'): address('10.0.0.1'),
+        }
+    )
+    assert await checker.undeliverable('a.com') is None
+    assert await checker.undeliverable('aaaa.com') is None
+    # sem MX e só com IP privado: não recebe email
+    assert 'does not accept email' in await checker.undeliverable(
+        'private.com'
+    )
+    assert checker._resolver.calls[:2] == [('a.com', 'MX'), ('a.com', 'A')]
+
+
+async def test_answers_are_cached_for_their_ttl(clock):
+    checker = _checker(
+        {
+            ('gmail.com', 'MX'): mx('smtp.gmail.com.'),
+            ('nope.com', 'MX'): dns.resolver.NXDOMAIN(),
+        }
+    )
+    for _ in range(2):
+        assert await checker.undeliverable('gmail.com') is None
+        assert await checker.undeliverable('nope.com')
+    assert len(checker._resolver.calls) == 2
+
+    # a recusa vence antes (cache_negative_ttl)
+    clock.value += 300
+    assert await checker.undeliverable('gmail.com') is None
+    assert await checker.undeliverable('nope.com')
+    assert len(checker._resolver.calls) == 3
+
+    clock.value += 3300
+    assert await checker.undeliverable('gmail.com') is None
+    assert len(checker._resolver.calls) == 4
+
+
+async def test_timeout_accepts_and_is_not_cached(clock):
+    checker = _checker({('slow.com', 'MX'): dns.exception.Timeout()})
+
+    # DNS sem resposta não impede o cadastro
+    await checker.check('ana@slow.com')
+    await checker.check('ana@slow.com')
+    assert checker._resolver.calls == [('slow.com', 'MX')] * 2
+    assert 'slow.com' not in checker._cache
+
+
+async def test_concurrent_lookups_share_one_query(clock):
+    checker = _checker({('nope.com', 'MX'): dns.resolver.NXDOMAIN()})
+    checker._resolver.gate = asyncio.Event()
+
+    lookups = [
+        asyncio.create_task(checker.undeliverable('nope.com'))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    checker._resolver.gate.set()
+    reasons = await asyncio.gather(*lookups)
+
+    assert checker._resolver.calls == [('nope.com', 'MX')]
+    assert len(set(reasons)) == 1 and reasons[0]
+    assert checker._pending == {}
@@ -0,0 +1,94 @@
+import time
+
+import jwt
+import pytest
+from config import config
+from cryptography.hazmat.primitives import serialization
+from src.infra.security.auth.jwt import JWTManager
+from src.infra.security.auth.keys import KeyRing, generate_key
+
+
+@pytest.fixture
+def pem(tmp_path):
+    """Gera um PEM privado novo e devolve o caminho"""
+
+    def make(name: str, algorithm: str = 'EdDSA') -> str:
+        path = str(tmp_path / f'{name}.pem')
+        generate_key(path, algorithm)
+        return path
+
+    return make
+
+
+def _public_pem(private: str) -> str:
+    """Só a parte pública (chave aposentada em JWT_PUBLIC_KEYS)"""
+    key = KeyRing.from_files([private]).signing.public_key
+    path = private.replace('.pem', '.pub.pem')
+    with open(path, 'wb') as f:
+        f.write(
+            key.public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+        )
+    return path
+
+
+def _manager(private, public=()) -> JWTManager:
+    settings = config.jwt.model_copy(
+        update={
+            'algorithm': 'EdDSA',
+            'private_keys': list(private),
+            'public_keys': list(public),
+            'cache_max_size': 0,
+        }
+    )
+    return JWTManager(settings)
+
+
+def _payload() -> dict:
+    return {'id': 1, 'exp': time.time() + 60}
+
+
+def test_token_carries_the_signing_kid(pem):
+    manager = _manager([pem('current'), pem('next', 'ES256')])
+    token = manager.create(_payload()).access_token
+
+    header = jwt.get_unverified_header(token)
+    assert header['kid'] == manager.keyring.signing.kid
+    assert header['alg'] == 'EdDSA'
+    assert manager.validate(token)['id'] == 1
+
+
+def test_rejects_a_token_signed_with_another_alg(pem):
+    manager = _manager([pem('current')])
+    kid = manager.keyring.signing.kid
+    other = KeyRing.from_files([pem('other', 'ES256')]).signing
+
+    forged = [
+        # kid da chave EdDSA, assinado com outra chave ES256
+        jwt.encode(
+            _payload(), other.private_key, 'ES256', headers={'kid': kid}
+        ),
+        # HS256 com um segredo qualquer no lugar da assinatura
+        jwt.encode(_payload(), 'x' * 32, 'HS256', headers={'kid': kid}),
+    ]
+    for token in forged:
+        with pytest.raises(jwt.exceptions.InvalidTokenError):
+            manager.validate(token)
+
+
+def test_rotated_out_key_still_verifies(pem):
+    old, new = pem('old'), pem('new')
+    token = _manager([old]).create(_payload()).access_token
+
+    # rotação: a nova assina e a antiga fica só para verificação
+    rotated = _manager([new], public=[_public_pem(old)])
+    kid = jwt.get_unverified_header(token)['kid']
+    assert rotated.keyring.signing.kid != kid
+    assert rotated.keyring.get(kid).private_key is None
+    assert rotated.validate(token)['id'] == 1
+
+    # fora da configuração: kid desconhecido
+    with pytest.raises(jwt.exceptions.InvalidTokenError):
+        _manager([new]).validate(token)
@@ -0,0 +1,40 @@
+import pytest
+from fastapi import HTTPException
+from src.infra.database.connect.redis import RedisManager
+from src.infra.security.auth.refresh import RefreshTokenManager
+
+
+@pytest.fixture
+def refresh(fake_redis, redis_config):
+    return RefreshTokenManager(RedisManager(redis_config))
+
+
+async def test_rotate_issues_a_new_token(refresh):
+    token = await refresh.issue(7)
+    grant = await refresh.rotate(token)
+    assert grant.user_id == 7 and grant.session_id is None
+    assert grant.refresh_token != token
+
+    assert (await refresh.rotate(grant.refresh_token)).user_id == 7
+
+
+async def test_rotate_detects_reuse_and_revokes_the_family(refresh):
+    stolen = await refresh.issue(7)
+    grant = await refresh.rotate(stolen)
+
+    with pytest.raises(HTTPException) as error:
+        await refresh.rotate(stolen)
+    assert error.value.status_code == 401
+    assert error.value.detail == 'Token revoked'
+
+    # o token legítimo da família também deixa de valer
+    with pytest.raises(HTTPException) as error:
+        await refresh.rotate(grant.refresh_token)
+    assert error.value.status_code == 401
+
+
+async def test_rotate_rejects_unknown_tokens(refresh):
+    for token in ('garbage', 'family.secret'):
+        with pytest.raises(HTTPException) as error:
+            await refresh.rotate(token)
+        assert error.value.detail == 'Invalid token'
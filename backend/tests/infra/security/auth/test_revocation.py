@@ -0,0 +1,66 @@
+import time
+
+import pytest
+from fastapi import HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials
+from src.infra.database.connect.redis import RedisManager
+from src.infra.security.auth import jwt as module
+from src.infra.security.auth.jwt import get_current_user_jwt, jwt_manager
+from src.infra.security.auth.revocation import (
+    REVOCATION_CHECKS,
+    TokenRevocation,
+)
+
+
+@pytest.fixture
+async def workers(fake_redis, redis_config, wait_for):
+    """Dois workers: o primeiro com o listener (Bloom filter) ativo"""
+    manager = RedisManager(redis_config)
+    worker, other = TokenRevocation(manager), TokenRevocation(manager)
+    await other.revoke('revoked-before-start', time.time() + 60)
+    worker.start()
+    await wait_for(lambda: worker.synced)
+    yield worker, other
+    await worker.stop()
+
+
+async def test_revocation_reaches_other_workers(workers, wait_for):
+    worker, other = workers
+    # carregado no rebuild do filtro
+    assert await worker.is_revoked('revoked-before-start')
+
+    await other.revoke('jti-1', time.time() + 60)
+    await wait_for(lambda: 'jti-1' in worker.filter)
+    assert await worker.is_revoked('jti-1')
+
+    # já expirado: nada a revogar
+    assert not await other.revoke('jti-2', time.time() - 1)
+
+
+async def test_filter_answers_unknown_tokens_without_redis(workers):
+    worker, _ = workers
+    checks = REVOCATION_CHECKS.value()
+    for i in range(100):
+        assert not await worker.is_revoked(f'valid-{i}')
+    # só falsos positivos do filtro vão ao Redis
+    assert REVOCATION_CHECKS.value() - checks < 5
+
+
+async def test_revoked_token_is_rejected_with_its_own_detail(
+    workers, monkeypatch, wait_for
+):
+    worker, other = workers
+    monkeypatch.setattr(module, 'token_revocation', worker)
+    payload = {'id': 7, 'jti': 'jti-3', 'exp': time.time() + 60}
+    token = jwt_manager.create(payload).access_token
+    await other.revoke('jti-3', payload['exp'])
+    await wait_for(lambda: 'jti-3' in worker.filter)
+
+    request = Request({'type': 'http', 'headers': []})
+    with pytest.raises(HTTPException) as error:
+        await get_current_user_jwt(
+            request,
+            HTTPAuthorizationCredentials(scheme='Bearer', credentials=token),
+        )
+    assert error.value.status_code == 401
+    assert error.value.detail == 'Token revoked'
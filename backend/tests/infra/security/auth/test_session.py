@@ -0,0 +1,51 @@
+from fastapi import Request, Response
+from src.core.domain.user import AuthPrincipal
+from src.infra.cache.user import user_cache
+from src.infra.database.connect.redis import SessionManager
+from src.infra.security.auth import session as module
+from src.infra.security.auth.session import (
+    SessionData,
+    get_current_user_cookie,
+)
+
+
+def _request(cookie: str) -> Request:
+    return Request(
+        {
+            'type': 'http',
+            'method': 'GET',
+            'path': '/',
+            'headers': [(b'cookie', f'session={cookie}'.encode())],
+        }
+    )
+
+
+async def test_cookie_dependency_returns_session_data(
+    fake_redis, redis_config, monkeypatch
+):
+    sessions = SessionManager(redis_config)
+    monkeypatch.setattr(module, 'session_manager', sessions)
+    principal = AuthPrincipal(
+        id=7,
+        username='ana',
+        email='ana@example.com',
+        blocked=False,
+        allowed=True,
+        version=0,
+    )
+    user_cache.cache.set(7, principal)
+    session_id = await sessions.create(
+        sessions.new_session_id(7), {'id': 7, 'session_id': 'x'}, 60
+    )
+
+    request = _request(session_id)
+    try:
+        auth = await get_current_user_cookie(request, Response())
+    finally:
+        user_cache.cache.pop(7)
+
+    assert auth == SessionData(
+        user=principal, payload={'id': 7, 'session_id': 'x'}
+    )
+    # memoizado na requisição
+    assert await get_current_user_cookie(request, Response()) is auth
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+
+import pytest
+from config import config
+from fastapi import HTTPException
+from src.infra.security.hashpass import HashPassManager, HashPassPool
+
+
+@pytest.fixture
+def pool():
+    pool = HashPassPool(
+        config.hashpass.model_copy(
+            update={
+                'executor': 'thread',
+                'workers': 1,
+                'max_queue': 1,
+                'retry_after': 7,
+            }
+        )
+    )
+    yield pool
+    pool.shutdown()
+
+
+async def test_rejects_with_503_when_workers_and_queue_are_full(
+    pool, wait_for
+):
+    release = threading.Event()
+    jobs = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+    try:
+        await wait_for(lambda: pool._in_flight == 2)
+
+        with pytest.raises(HTTPException) as error:
+            await pool.run(release.wait)
+        assert error.value.status_code == 503
+        assert error.value.headers == {'Retry-After': '7'}
+    finally:
+        release.set()
+    assert await asyncio.gather(*jobs) == [True, True]
+    await wait_for(lambda: pool._in_flight == 0)
+
+
+async def test_cancelled_request_keeps_slot_until_worker_finishes(
+    pool, wait_for
+):
+    release = threading.Event()
+    job = asyncio.create_task(pool.run(release.wait))
+    try:
+        await wait_for(lambda: pool._in_flight == 1)
+
+        job.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await job
+        # o hash continua rodando na thread: a vaga não pode voltar ainda
+        assert pool._in_flight == 1
+    finally:
+        release.set()
+    await wait_for(lambda: pool._in_flight == 0)
+
+
+def _manager(pool, algorithm='bcrypt', **costs) -> HashPassManager:
+    # custos baixos: os testes medem a regra, não o hash
+    settings = config.hashpass.model_copy(
+        update={
+            'algorithm': algorithm,
+            'bcrypt_rounds': 4,
+            'argon2_time_cost': 1,
+            'argon2_memory_cost': 1024,
+            'argon2_parallelism': 1,
+        }
+        | costs
+    )
+    return HashPassManager(pool, settings)
+
+
+@pytest.mark.parametrize(
+    'algorithm, costs',
+    [
+        ('bcrypt', {'bcrypt_rounds': 5}),
+        ('argon2id', {'argon2_time_cost': 2}),
+        ('argon2id', {'argon2_memory_cost': 2048}),
+    ],
+)
+def test_cost_change_needs_rehash(pool, algorithm, costs):
+    hashed = _manager(pool, algorithm).hash('secret')
+    assert not _manager(pool, algorithm).needs_rehash(hashed)
+
+    upgraded = _manager(pool, algorithm, **costs)
+    assert upgraded.needs_rehash(hashed)
+    assert upgraded.verify('secret', hashed)
+
+
+@pytest.mark.parametrize(
+    'old, new', [('bcrypt', 'argon2id'), ('argon2id', 'bcrypt')]
+)
+async def test_algorithm_change_needs_rehash(pool, old, new):
+    hashed = _manager(pool, old).hash('secret')
+    manager = _manager(pool, new)
+
+    # o hash antigo continua válido pela engine que o gerou
+    assert await manager.verify_async('secret', hashed)
+    assert manager.needs_rehash(hashed)
+    rehashed = await manager.hash_async('secret')
+    assert rehashed.startswith(manager.engine.prefixes)
+    assert not manager.needs_rehash(rehashed)
@@ -0,0 +1,88 @@
+import orjson
+import pytest
+from config import config
+from fastapi import HTTPException, Request
+from src.infra.database.connect.redis import RedisManager
+from src.infra.database.connect.shard import hash_tag
+from src.infra.security.ratelimit import RateLimiter
+
+
+def _limiter(redis_config, **update) -> RateLimiter:
+    settings = config.ratelimit.model_copy(
+        update={'enabled': True, 'ip': 3, 'username': 2, 'total': 100} | update
+    )
+    return RateLimiter(RedisManager(redis_config), settings)
+
+
+def _request(
+    body: dict, client: str = '1.2.3.4', forwarded: str = None
+) -> Request:
+    headers = [(b'content-type', b'application/json')]
+    if forwarded:
+        headers.append((b'x-forwarded-for', forwarded.encode()))
+
+    async def receive():
+        return {'type': 'http.request', 'body': orjson.dumps(body)}
+
+    return Request(
+        {
+            'type': 'http',
+            'method': 'POST',
+            'path': '/signin',
+            'headers': headers,
+            'client': (client, 50000),
+        },
+        receive,
+    )
+
+
+async def test_responds_429_with_retry_after(fake_redis, redis_config):
+    dependency = _limiter(redis_config).limit('signin')
+    for _ in range(3):
+        await dependency(_request({}))
+
+    with pytest.raises(HTTPException) as error:
+        await dependency(_request({}))
+    assert error.value.status_code == 429
+    assert int(error.value.headers['Retry-After']) >= 1
+
+
+async def test_username_limit_spans_ips(fake_redis, redis_config):
+    limiter = _limiter(redis_config)
+    assert not await limiter.hit('signin', '6.6.6.6', 'ana')
+    assert not await limiter.hit('signin', '7.7.7.7', ' Ana')
+
+    # ataque distribuído: IP novo, mesma conta (normalizada)
+    assert await limiter.hit('signin', '8.8.8.8', 'ANA')
+    assert not await limiter.hit('signin', '8.8.8.8', 'bia')
+
+
+async def test_limits_are_shared_through_redis(fake_redis, redis_config):
+    # outro worker: buckets locais vazios, contagem no Redis
+    first, second = _limiter(redis_config), _limiter(redis_config)
+    for _ in range(3):
+        assert not await first.hit('signin', '1.2.3.4')
+    assert await second.hit('signin', '1.2.3.4')
+
+
+def test_keys_of_a_call_share_the_scope_hash_tag():
+    keys = [
+        RateLimiter.key('signin', 'ip', '1.2.3.4'),
+        RateLimiter.key('signin', 'user', 'ana'),
+        RateLimiter.key('signin', 'global'),
+    ]
+    assert {hash_tag(key) for key in keys} == {'signin'}
+
+
+def test_client_ip_behind_trusted_proxy(fake_redis, redis_config):
+    limiter = _limiter(redis_config, trusted_proxies=['10.0.0.0/8'])
+    forwarded = '9.9.9.9, 5.6.7.8, 10.0.0.2'
+
+    # a conexão vem de um proxy confiável: primeiro IP não confiável à
+    # direita (9.9.9.9 pode ter sido forjado pelo cliente)
+    request = _request({}, client='10.0.0.1', forwarded=forwarded)
+    assert limiter.client_ip(request) == '5.6.7.8'
+
+    # conexão direta: o cabeçalho é ignorado
+    request = _request({}, client='5.6.7.8', forwarded='1.1.1.1')
+    assert limiter.client_ip(request) == '5.6.7.8'
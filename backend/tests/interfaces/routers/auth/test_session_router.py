@@ -0,0 +1,24 @@
+import pytest
+from fastapi import HTTPException
+from src.infra.security.auth.session import SessionData
+from src.interfaces.routers.auth.session import (
+    list_sessions,
+    revoke_all_sessions,
+    revoke_session,
+)
+
+
+@pytest.mark.parametrize(
+    'call',
+    [
+        list_sessions,
+        revoke_all_sessions,
+        lambda auth: revoke_session('x', auth),
+    ],
+)
+async def test_session_routes_without_user_are_unauthorized(call):
+    # token/sessão válidos de um usuário que não existe mais
+    auth = SessionData(user=None, payload={'id': 7, 'session_id': 'x'})
+    with pytest.raises(HTTPException) as error:
+        await call(auth)
+    assert error.value.status_code == 401
@@ -0,0 +1,12 @@
+import pytest
+from fastapi import HTTPException, Response
+from src.infra.security.auth.session import SessionData
+from src.interfaces.routers.auth.user import logout
+
+
+async def test_logout_without_user_is_unauthorized():
+    # token/sessão válidos de um usuário que não existe mais
+    auth = SessionData(user=None, payload={'id': 7, 'session_id': 'x'})
+    with pytest.raises(HTTPException) as error:
+        await logout(Response(), auth)
+    assert error.value.status_code == 401
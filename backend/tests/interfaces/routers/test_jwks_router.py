@@ -0,0 +1,61 @@
+import pytest
+from config import config
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.infra.security.auth.jwt import jwt_manager
+from src.infra.security.auth.keys import KeyRing, generate_key
+from src.interfaces.routers.jwks import router
+
+
+@pytest.fixture
+def keyring(tmp_path, monkeypatch):
+    keys = []
+    for name, algorithm in (('current', 'EdDSA'), ('next', 'ES256')):
+        generate_key(str(tmp_path / f'{name}.pem'), algorithm)
+        keys.append(str(tmp_path / f'{name}.pem'))
+    keyring = KeyRing.from_files(keys)
+    monkeypatch.setattr(jwt_manager, 'keyring', keyring)
+    return keyring
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_jwks_publishes_the_public_keys(keyring, client):
+    response = client.get('/.well-known/jwks.json')
+
+    assert response.status_code == 200
+    keys = response.json()['keys']
+    assert [k['kid'] for k in keys] == list(keyring.keys)
+    assert {k['alg'] for k in keys} == {'EdDSA', 'ES256'}
+    assert all(k['use'] == 'sig' and 'd' not in k for k in keys)
+    assert response.headers['Cache-Control'] == (
+        f'public, max-age={config.jwt.jwks_max_age}'
+    )
+    assert response.headers['ETag'] == keyring.etag()
+
+
+def test_jwks_not_modified_for_matching_etag(keyring, client):
+    etag = client.get('/.well-known/jwks.json').headers['ETag']
+
+    response = client.get(
+        '/.well-known/jwks.json', headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['ETag'] == etag
+
+    response = client.get(
+        '/.well-known/jwks.json', headers={'If-None-Match': '"other"'}
+    )
+    assert response.status_code == 200
+
+
+def test_jwks_is_hidden_for_shared_secrets(monkeypatch, client):
+    # HS*: sem keyring
+    monkeypatch.setattr(jwt_manager, 'keyring', None)
+    assert client.get('/.well-known/jwks.json').status_code == 404
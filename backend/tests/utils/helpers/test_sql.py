@@ -0,0 +1,23 @@
+from src.utils.helpers.sql import UnitOfWork
+
+
+async def test_flush_sends_one_update_with_changed_columns(
+    db_session, user_model
+):
+    before = user_model.updated_at
+
+    uow = UnitOfWork(db_session)
+    uow.set(user_model, attempts=1)
+    uow.set(user_model, attempts=0, blocked=False)
+    await uow.commit()
+
+    statements = db_session.info['statements']
+    updates = [s for s in statements if s.startswith('UPDATE')]
+    assert len(updates) == 1
+    returning = updates[0].split('RETURNING')[1]
+    assert 'attempts' in returning and 'updated_at' in returning
+    assert 'password' not in returning and 'document' not in returning
+
+    assert user_model.attempts == 0
+    assert user_model.updated_at >= before
+    assert not db_session.dirty